@@ -0,0 +1,4 @@
+"""
+Root pytest configuration: pytest adds this directory to sys.path once,
+so tests import the application as `src.*` without per-file path edits.
+"""
@@ -4,20 +4,31 @@ Main entrypoint for Agentic Video QA System CLI
 """
 
 import sys
-import argparse
 import asyncio
-from src.cli_runner import main as cli_main
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Agentic Video QA CLI")
-    # Optional positional 'mode' for legacy compatibility ('cli' only)
-    parser.add_argument('mode', nargs='?', choices=['cli'], help='Legacy mode specifier (must be "cli"). Can be omitted.', default=None)
-    parser.add_argument("--question", "-q", required=True, help="Question to ask")
-    args = parser.parse_args()
+    # Imported here so `import main` does not pay for argparse
+    from src.cli_args import build_cli_parser
+    args = build_cli_parser().parse_args()
+
+    # Import the runner only after argparse succeeds so --help skips the
+    # LangGraph / Vertex AI import chain
+    from src.cli_runner import main as cli_main, run_batch
+    try:
+        import uvloop
+    except ImportError:  # uvloop is unavailable on Windows
+        uvloop = None
+
+    # Prefer uvloop's faster event loop when it is installed
+    runner = uvloop.run if uvloop is not None else asyncio.run
+    if args.batch_file:
+        runner(run_batch(args.batch_file, child_info=args.child_info, concurrency=args.concurrency))
+        return
+
     # Prepare arguments for CLI runner
     sys.argv = ["cli_runner", args.question]
-    asyncio.run(cli_main())
+    runner(cli_main())
 
 
 if __name__ == "__main__":
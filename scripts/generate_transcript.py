@@ -4,18 +4,26 @@ One-time script to generate a full-day transcript over the 5 videos
 listed in config/videos.yaml using the user's transcript prompt.
 
 It uses the same adapters (LLMAdapter for Gemini and CatalogAdapter),
-processes videos sequentially, applies retry with exponential backoff,
-and writes a text transcript to data/transcripts/transcript_YYYY-MM-DD.txt.
+analyzes videos concurrently (bounded by VIDEO_CONCURRENCY, default 4),
+applies retry with exponential backoff, and writes a text transcript to
+data/transcripts/transcript_YYYY-MM-DD.txt in catalog order.
+
+Successful video responses are cached on disk through LLMAdapter's response
+cache (see src/adapters/llm_cache.py), so re-runs after a partial failure skip
+videos that already succeeded. Pass --no-cache to force fresh calls.
 """
 
 import os
 import sys
 import time
+import asyncio
 import logging
+import argparse
 from datetime import datetime
 
 from src.adapters.llm_adapter import LLMAdapter
 from src.adapters.catalog_adapter import CatalogAdapter
+from src.prompt_loader import load_prompt
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("generate_transcript")
@@ -25,15 +33,12 @@ TRANSCRIPT_DIR = os.path.join("data", "transcripts")
 def ensure_dir(path: str):
     os.makedirs(path, exist_ok=True)
 
-def load_prompt() -> str:
-    with open("prompts/transcript_one_time.txt", "r") as f:
-        return f.read().strip()
-
-def call_with_retries(llm: LLMAdapter, prompt: str, gcs_uri: str, retries: int = 3, base_sleep: float = 2.0) -> str:
+def call_with_retries(llm: LLMAdapter, prompt: str, gcs_uri: str, retries: int = 3, base_sleep: float = 2.0,
+                      cache: bool = True) -> str:
     last_err = None
     for attempt in range(1, retries + 1):
         try:
-            return llm.call_video(prompt=prompt, gcs_uri=gcs_uri)
+            return llm.call_video(prompt=prompt, gcs_uri=gcs_uri, cache=cache)
         except Exception as e:
             last_err = e
             sleep_s = base_sleep * (2 ** (attempt - 1))
@@ -41,9 +46,25 @@ def call_with_retries(llm: LLMAdapter, prompt: str, gcs_uri: str, retries: int =
             time.sleep(sleep_s)
     raise last_err
 
-def main():
+async def analyze_video(sem: asyncio.Semaphore, llm: LLMAdapter, prompt: str, vid: str, gcs_uri: str,
+                        cache: bool = True) -> str:
+    async with sem:
+        print(f"\nAnalyzing {vid} ...")
+        try:
+            # call_with_retries blocks (network + backoff sleeps), so run it off the event loop
+            return await asyncio.to_thread(call_with_retries, llm, prompt, gcs_uri, retries=3, base_sleep=2.0, cache=cache)
+        except Exception as e:
+            logger.error(f"Failed to analyze {vid}: {e}")
+            return "[ERROR] Could not generate transcript for this video."
+
+async def main():
+    parser = argparse.ArgumentParser(description="Generate a full-day transcript for the video catalog")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk LLM response cache")
+    args = parser.parse_args()
+    cache = not args.no_cache
+
     # Show prompt before running (per user request)
-    user_prompt = load_prompt()
+    user_prompt = load_prompt("prompts/transcript_one_time.txt").strip()
     print("\n===== TRANSCRIPT PROMPT (will be used for each video) =====\n")
     print(user_prompt)
     print("\n==========================================================\n")
@@ -66,20 +87,18 @@ def main():
     videos = catalog.list_catalog()
     logger.info(f"Found {len(videos)} videos in catalog; generating transcript for all.")
 
-    lines = []
-    lines.append(f"Day Transcript - {date_str}")
-    lines.append("")
-
+    sem = asyncio.Semaphore(int(os.getenv("VIDEO_CONCURRENCY", "4")))
+    headers = []
+    tasks = []
     for idx, video in enumerate(videos, start=1):
         vid = video['id']
         uri = video['gcs_uri']
-        meta_header = (
+        headers.append(
             f"Video {idx}: {vid}\n"
             f"  Session: {video.get('session-type','Unknown')}\n"
             f"  Start: {video.get('start-time','Unknown')}  End: {video.get('end-time','Unknown')}\n"
             f"  Description: {video.get('act-description','No description')}\n"
         )
-        print(f"\nAnalyzing {vid} ...")
 
         # Use the user's prompt verbatim to call the video model
         # Provide per-video metadata context to the model
@@ -91,25 +110,31 @@ def main():
             f"Description: {video.get('act-description','No description')}\n"
         )
         prompt = user_prompt + "\n\n" + context
-
-        try:
-            text = call_with_retries(llm, prompt, uri, retries=3, base_sleep=2.0)
-        except Exception as e:
-            logger.error(f"Failed to analyze {vid}: {e}")
-            text = "[ERROR] Could not generate transcript for this video."
-
-        lines.append("=" * 80)
-        lines.append(meta_header)
-        lines.append(text)
-        lines.append("")
-
-        # Friendly pacing between videos
-        time.sleep(1.5)
-
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+        # Rate limiting is left to the semaphore and the retry backoff in call_with_retries
+        tasks.append(asyncio.create_task(analyze_video(sem, llm, prompt, vid, uri, cache=cache)))
+
+    # Write each section as soon as it (and every section before it) is done, so output
+    # stays in catalog order; stream into a temp file and swap it in only once complete
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write(f"Day Transcript - {date_str}\n\n")
+        for idx, (meta_header, task) in enumerate(zip(headers, tasks)):
+            text = await task
+            if idx:
+                f.write("\n")
+            f.write("=" * 80 + "\n")
+            f.write(meta_header + "\n")
+            f.write(text + "\n")
+            f.flush()
+    os.replace(tmp_path, out_path)
 
     print(f"\nSaved transcript: {out_path}")
 
 if __name__ == "__main__":
-    main()
+    try:
+        import uvloop
+    except ImportError:  # uvloop is unavailable on Windows
+        uvloop = None
+    # Prefer uvloop's faster event loop when it is installed
+    runner = uvloop.run if uvloop is not None else asyncio.run
+    runner(main())
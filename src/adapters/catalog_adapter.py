@@ -1,23 +1,48 @@
 import yaml
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Sequence, Tuple
 from pathlib import Path
 import logging
+import functools
 
 logger = logging.getLogger(__name__)
 
+# LibYAML's C loader is ~10x faster than the pure-Python SafeLoader when available
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 class CatalogAdapter:
     """Adapter for video catalog operations"""
     
+    # Validated catalogs keyed by (resolved YAML path, mtime_ns), shared by every instance in the process
+    _memo: Dict[Tuple[str, int], Dict[str, Dict]] = {}
+    
     def __init__(self, catalog_path: str = "config/videos.yaml"):
         self.catalog_path = Path(catalog_path)
         self._catalog = None
+        self._meta_views: Dict[str, Mapping] = {}
+        self._videos: Sequence[Mapping] = ()
+        self._uris: Dict[str, str] = {}
         self._load_catalog()
     
+    def _build_indexes(self):
+        """Precompute read-only metadata views, the catalog listing and the id -> URI map for O(1) lookups"""
+        self._meta_views = {vid: MappingProxyType(v) for vid, v in self._catalog.items()}
+        self._videos = tuple(self._meta_views.values())
+        self._uris = {vid: v['gcs_uri'] for vid, v in self._catalog.items()}
+    
     def _load_catalog(self):
-        """Load the video catalog from YAML"""
+        """Load the video catalog from YAML (or the in-process memo when unchanged)"""
         try:
+            memo_key = (str(self.catalog_path.resolve()), self.catalog_path.stat().st_mtime_ns)
+            # Fast path: another instance already loaded this exact YAML version in this process
+            memoized = CatalogAdapter._memo.get(memo_key)
+            if memoized is not None:
+                self._catalog = memoized
+                self._build_indexes()
+                return
+            
             with open(self.catalog_path, 'r') as f:
-                data = yaml.safe_load(f)
+                data = yaml.load(f, Loader=_YAML_LOADER)
                 self._catalog = {video['id']: video for video in data.get('videos', [])}
             
             # Validation
@@ -34,21 +59,24 @@ class CatalogAdapter:
                 if not (uri.startswith('gs://') or uri.startswith('https://')):
                     raise ValueError(f"Invalid video URI for video {video_id}: {uri}")
             
+            CatalogAdapter._memo[memo_key] = self._catalog
+            self._build_indexes()
             logger.info(f"Loaded {len(self._catalog)} videos from catalog")
             
         except Exception as e:
             logger.error(f"Failed to load catalog: {e}")
             raise
     
-    def list_catalog(self) -> List[Dict]:
-        """List all videos in catalog"""
-        return list(self._catalog.values())
+    def list_catalog(self) -> Sequence[Mapping]:
+        """List all videos in catalog (shared read-only snapshot, built once at load)"""
+        return self._videos
     
     def get_uri(self, video_id: str) -> str:
         """Get GCS URI for a video ID"""
-        if video_id not in self._catalog:
-            raise KeyError(f"Video ID {video_id} not found in catalog")
-        return self._catalog[video_id]['gcs_uri']
+        try:
+            return self._uris[video_id]
+        except KeyError:
+            raise KeyError(f"Video ID {video_id} not found in catalog") from None
     
     def has(self, video_id: str) -> bool:
         """Check if video ID exists in catalog"""
@@ -60,8 +88,14 @@ class CatalogAdapter:
             raise KeyError(f"Video ID {video_id} not found in catalog")
         return self._catalog[video_id].get('session-type', 'Unknown')
     
-    def get_metadata(self, video_id: str) -> Dict:
-        """Get full metadata for a video ID"""
-        if video_id not in self._catalog:
-            raise KeyError(f"Video ID {video_id} not found in catalog")
-        return self._catalog[video_id].copy()
+    def get_metadata(self, video_id: str) -> Mapping:
+        """Get full metadata for a video ID (read-only view, no per-call copy)"""
+        try:
+            return self._meta_views[video_id]
+        except KeyError:
+            raise KeyError(f"Video ID {video_id} not found in catalog") from None
+
+@functools.lru_cache(maxsize=1)
+def get_catalog_adapter() -> CatalogAdapter:
+    """Process-wide default CatalogAdapter (catalog parsed once per process)"""
+    return CatalogAdapter()
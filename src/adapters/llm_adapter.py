@@ -2,23 +2,94 @@ import os
 import json
 import logging
 import re
+import asyncio
+import functools
+import threading
+
+from typing import Optional, Dict, Any, List
+
+# Must be set before grpc is imported (via the Vertex SDK); fork support adds per-call overhead
+os.environ.setdefault("GRPC_ENABLE_FORK_SUPPORT", "0")
 
-from typing import Optional, Dict, Any
 from langchain_google_vertexai import ChatVertexAI
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, SystemMessage
 import vertexai
 from vertexai.generative_models import GenerativeModel, Part
 
+from src.adapters.llm_cache import LLMCache, make_key
+
 logger = logging.getLogger(__name__)
 
+# (project, location) pairs already passed to vertexai.init in this process
+_INITIALIZED = set()
+
+# Markdown code fences wrapped around JSON payloads (```json ... ```)
+_FENCE_HEAD = re.compile(r"^```[a-zA-Z0-9]*\n")
+_FENCE_TAIL = re.compile(r"\n```\s*$")
+_CLOSERS = {"{": "}", "[": "]"}
+
+# Bump to invalidate cached responses when prompt framing (e.g. _json_prompt) changes
+RESPONSE_CACHE_VERSION = "2"
+
+def _balanced_span(s: str, start: int) -> Optional[str]:
+    """Return the bracket-balanced JSON span opening at s[start], or None.
+    Single linear pass that skips brackets inside string literals.
+    """
+    expected = []
+    in_string = False
+    escaped = False
+    for i in range(start, len(s)):
+        ch = s[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            expected.append(_CLOSERS[ch])
+        elif ch == "}" or ch == "]":
+            if not expected or expected.pop() != ch:
+                return None
+            if not expected:
+                return s[start:i + 1]
+    return None
+
+def _outer_span(s: str, opener: str) -> Optional[str]:
+    """Return the substring from the first opener to the last matching closer, or None"""
+    lo = s.find(opener)
+    if lo == -1:
+        return None
+    hi = s.rfind(_CLOSERS[opener])
+    return s[lo:hi + 1] if hi > lo else None
+
+@functools.lru_cache(maxsize=64)
+def _video_part(gcs_uri: str, mime_type: str = "video/mp4") -> Part:
+    """Build (and memoize) the multimodal Part referencing a video URI"""
+    return Part.from_uri(gcs_uri, mime_type=mime_type)
+
 class LLMAdapter:
     """Adapter for Vertex AI Generative AI Gemini operations"""
     
-    def __init__(self, model_name: str = "gemini-2.5-flash", project_id: str = None, location: str = "us-central1"):
+    def __init__(self, model_name: str = "gemini-2.5-flash", project_id: str = None, location: str = "us-central1", warmup: bool = False, max_concurrency: int = None, cache: Optional[LLMCache] = None):
         self.model_name = model_name
         self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
         self.location = location
+        # Upper bound on async calls in flight across all nodes (provider rate limits)
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        self._sem = None
+        self._sem_loop = None
+        # Greedy (temperature == 0) text/JSON responses are replayed from disk until the cache TTL; LLM_RESPONSE_CACHE=0 disables
+        if cache is None and os.getenv("LLM_RESPONSE_CACHE", "1") != "0":
+            cache = LLMCache()
+        self._cache = cache
         self._setup_vertex_ai()
+        if warmup:
+            # Opt-in (a real, billed request): open the channel / refresh credentials off the critical path
+            threading.Thread(target=self._warmup, name="vertex-warmup", daemon=True).start()
     
     def _setup_vertex_ai(self):
         """Setup Vertex AI with credentials"""
@@ -26,10 +97,16 @@ class LLMAdapter:
             raise ValueError("GOOGLE_CLOUD_PROJECT environment variable not set")
         
         # Initialize Vertex AI SDK for direct GenerativeModel usage
-        try:
-            vertexai.init(project=self.project_id, location=self.location)
-        except Exception as e:
-            logger.warning(f"vertexai.init failed or already initialized: {e}")
+        init_key = (self.project_id, self.location)
+        if init_key not in _INITIALIZED:
+            try:
+                vertexai.init(project=self.project_id, location=self.location)
+                _INITIALIZED.add(init_key)
+            except Exception as e:
+                logger.warning(f"vertexai.init failed or already initialized: {e}")
+        
+        # Reused by every multimodal call instead of constructing one per request
+        self._gm = GenerativeModel(self.model_name)
         
         # Initialize the Vertex AI Chat model for Gemini 2.5 Flash
         self._llm = ChatVertexAI(
@@ -40,122 +117,262 @@ class LLMAdapter:
         
         logger.info(f"Initialized Vertex AI Generative AI model: {self.model_name}")
     
-    def call_text(self, prompt: str, temperature: float = 0.7, timeout: int = 30) -> str:
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Adapter-wide semaphore for async calls, recreated if the event loop changes"""
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._sem_loop is not loop:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+            self._sem_loop = loop
+        return self._sem
+    
+    def _warmup(self):
+        """Fire a 1-token request so the first real call skips the cold-start handshake"""
+        try:
+            self._gm.generate_content("ok", generation_config={"max_output_tokens": 1})
+            logger.debug("Vertex AI warm-up completed")
+        except Exception as e:
+            logger.debug(f"Vertex AI warm-up failed (ignored): {e}")
+    
+    def call_text(self, prompt: str, temperature: float = 0.7, timeout: int = 30, system: Optional[str] = None) -> str:
         """Call Vertex AI Generative AI Gemini for text generation"""
         try:
             logger.info(f"Calling text model with prompt length: {len(prompt)}")
+            key = self._cache_key("text", prompt, temperature, system)
+            cached = self._cache.get(key) if key else None
+            if cached is not None:
+                return cached
             
             # Use Vertex AI for text generation
-            message = HumanMessage(content=prompt)
-            response = self._llm.invoke([message])
-            
-            if not response.content:
-                raise ValueError("Empty response from Vertex AI Generative AI Gemini")
-            
-            text_response = response.content
-            logger.info(f"Text response generated successfully")
-            return text_response.strip()
+            response = self._llm.invoke(self._messages(prompt, system), temperature=temperature)
+            text = self._text_from_response(response)
+            if key:
+                self._cache.put(key, text)
+            return text
             
         except Exception as e:
             logger.error(f"Text call failed: {e}")
             raise
     
-    def call_json(self, prompt: str, temperature: float = 0.0, timeout: int = 30) -> Dict[str, Any]:
+    async def acall_text(self, prompt: str, temperature: float = 0.7, timeout: int = 30, system: Optional[str] = None) -> str:
+        """Async twin of call_text; awaits the model without blocking the event loop"""
+        try:
+            logger.info(f"Calling text model (async) with prompt length: {len(prompt)}")
+            key = self._cache_key("text", prompt, temperature, system)
+            cached = await asyncio.to_thread(self._cache.get, key) if key else None
+            if cached is not None:
+                return cached
+            async with self._semaphore():
+                response = await self._llm.ainvoke(self._messages(prompt, system), temperature=temperature)
+            text = self._text_from_response(response)
+            if key:
+                await asyncio.to_thread(self._cache.put, key, text)
+            return text
+            
+        except Exception as e:
+            logger.error(f"Async text call failed: {e}")
+            raise
+    
+    def call_json(self, prompt: str, temperature: float = 0.0, timeout: int = 30, system: Optional[str] = None) -> Dict[str, Any]:
         """Call Vertex AI Generative AI Gemini for JSON generation with strict validation"""
         try:
             logger.info(f"Calling JSON model with prompt length: {len(prompt)}")
+            key = self._cache_key("json", prompt, temperature, system)
+            cached = self._cache.get(key) if key else None
+            if cached is not None:
+                return json.loads(cached)
             
-            # Ensure prompt emphasizes JSON-only output
-            json_prompt = f"{prompt}\n\nIMPORTANT: Return ONLY valid JSON. No prose, no explanations, no markdown formatting."
-            
-            message = HumanMessage(content=json_prompt)
-            response = self._llm.invoke([message])
-            
-            if not response.content:
-                raise ValueError("Empty response from Vertex AI Generative AI Gemini")
-            
-            response_text = response.content
-
-            # Try to sanitize common wrappers (markdown fences, leading text)
-            cleaned = self._extract_json_text(response_text)
-            try:
-                result = json.loads(cleaned)
-                logger.info("JSON response parsed successfully")
-                return result
-            except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON response: {response_text}")
-                logger.error(f"Sanitized candidate: {cleaned}")
-                logger.error(f"JSON parse error: {e}")
-                raise ValueError(f"Invalid JSON response: {e}")
+            response = self._llm.invoke(self._messages(self._json_prompt(prompt), system), temperature=temperature)
+            result = self._json_from_response(response)
+            if key:
+                self._cache.put(key, json.dumps(result))
+            return result
                 
         except Exception as e:
             logger.error(f"JSON call failed: {e}")
             raise
+    
+    async def acall_json(self, prompt: str, temperature: float = 0.0, timeout: int = 30, system: Optional[str] = None) -> Dict[str, Any]:
+        """Async twin of call_json"""
+        try:
+            logger.info(f"Calling JSON model (async) with prompt length: {len(prompt)}")
+            key = self._cache_key("json", prompt, temperature, system)
+            cached = await asyncio.to_thread(self._cache.get, key) if key else None
+            if cached is not None:
+                return json.loads(cached)
+            messages = self._messages(self._json_prompt(prompt), system)
+            async with self._semaphore():
+                response = await self._llm.ainvoke(messages, temperature=temperature)
+            result = self._json_from_response(response)
+            if key:
+                await asyncio.to_thread(self._cache.put, key, json.dumps(result))
+            return result
+                
+        except Exception as e:
+            logger.error(f"Async JSON call failed: {e}")
+            raise
+    
+    def _cache_key(self, kind: str, prompt: str, temperature: float, system: Optional[str]) -> Optional[str]:
+        """Response-cache key, or None when caching does not apply (disabled or sampling with temperature > 0)"""
+        if self._cache is None or temperature != 0:
+            return None
+        return make_key(RESPONSE_CACHE_VERSION, self.model_name, kind, str(temperature), system or "", prompt)
+    
+    def _video_cache_key(self, prompt: str, gcs_uris: List[str]) -> Optional[str]:
+        """Response-cache key for an opted-in video call, or None when the cache is disabled"""
+        if self._cache is None:
+            return None
+        return make_key(RESPONSE_CACHE_VERSION, self.model_name, "video", prompt, *gcs_uris)
+    
+    def _messages(self, prompt: str, system: Optional[str] = None) -> list:
+        """Build the chat messages; a static system block keeps the prompt prefix cacheable"""
+        if system:
+            return [SystemMessage(content=system), HumanMessage(content=prompt)]
+        return [HumanMessage(content=prompt)]
+    
+    def _json_prompt(self, prompt: str) -> str:
+        """Ensure prompt emphasizes JSON-only output"""
+        return f"{prompt}\n\nIMPORTANT: Return ONLY valid JSON. No prose, no explanations, no markdown formatting."
+    
+    def _text_from_response(self, response) -> str:
+        """Validate and strip a chat model text response"""
+        if not response.content:
+            raise ValueError("Empty response from Vertex AI Generative AI Gemini")
+        
+        text_response = response.content
+        logger.info(f"Text response generated successfully")
+        return text_response.strip()
+    
+    def _json_from_response(self, response) -> Dict[str, Any]:
+        """Sanitize and parse a chat model response that should contain JSON"""
+        if not response.content:
+            raise ValueError("Empty response from Vertex AI Generative AI Gemini")
+        
+        response_text = response.content
+
+        # Try to sanitize common wrappers (markdown fences, leading text)
+        cleaned = self._extract_json_text(response_text)
+        try:
+            result = json.loads(cleaned)
+            logger.info("JSON response parsed successfully")
+            return result
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON response: {response_text}")
+            logger.error(f"Sanitized candidate: {cleaned}")
+            logger.error(f"JSON parse error: {e}")
+            raise ValueError(f"Invalid JSON response: {e}")
 
     def _extract_json_text(self, text: str) -> str:
         """Extract probable JSON payload from model output.
         - Strips markdown code fences ```json ... ``` or ``` ... ```
-        - If still not pure JSON, attempts to grab substring from first '{' to last '}'
+        - If still not pure JSON, grabs the bracket-balanced object/array starting at the
+          first '{' / '[' (or first-to-last bracket when unbalanced)
         - Falls back to original stripped text
         """
         s = text.strip()
         # Remove markdown code fences
         if s.startswith("```"):
             # Remove first line fence
-            s = re.sub(r"^```[a-zA-Z0-9]*\n", "", s)
+            s = _FENCE_HEAD.sub("", s)
             # Remove trailing fence
-            s = re.sub(r"\n```\s*$", "", s)
+            s = _FENCE_TAIL.sub("", s)
             s = s.strip()
         # Quick path: already looks like JSON object/array
         if (s.startswith("{") and s.endswith("}")) or (s.startswith("[") and s.endswith("]")):
             return s
         # Try to find the first JSON object or array in the text
-        obj_match = re.search(r"\{[\s\S]*\}", s)
-        arr_match = re.search(r"\[[\s\S]*\]", s)
-        candidate = None
-        if obj_match and arr_match:
-            # Pick the longer span
-            candidate = obj_match.group(0) if len(obj_match.group(0)) >= len(arr_match.group(0)) else arr_match.group(0)
-        elif obj_match:
-            candidate = obj_match.group(0)
-        elif arr_match:
-            candidate = arr_match.group(0)
-        if candidate:
-            return candidate.strip()
+        spans = []
+        for opener in ("{", "["):
+            start = s.find(opener)
+            if start != -1:
+                span = _balanced_span(s, start) or _outer_span(s, opener)
+                if span:
+                    spans.append(span)
+        if spans:
+            # Pick the longer span (object wins ties)
+            return max(spans, key=len).strip()
         return s
     
-    def call_video(self, prompt: str, gcs_uri: str, timeout: int = 60) -> str:
-        """Call Gemini 2.5 Flash with multimodal input (text + GCS video)."""
+    def call_video(self, prompt: str, gcs_uri: str, timeout: int = 60, cache: bool = False) -> str:
+        """Call Gemini 2.5 Flash with multimodal input (text + GCS video).
+        cache=True opts this (sampled) call into the response cache, keyed by prompt and URI;
+        meant for transcript generation, not per-question answers.
+        """
+        return self.call_videos(prompt, [gcs_uri], timeout=timeout, cache=cache)
+    
+    async def acall_video(self, prompt: str, gcs_uri: str, timeout: int = 60, cache: bool = False) -> str:
+        """Async twin of call_video using the SDK's generate_content_async"""
+        return await self.acall_videos(prompt, [gcs_uri], timeout=timeout, cache=cache)
+    
+    def call_videos(self, prompt: str, gcs_uris: List[str], timeout: int = 60, cache: bool = False) -> str:
+        """Call Gemini with one prompt over several GCS videos (one part per URI, in order)"""
         try:
-            logger.info(f"Calling video model for URI: {self._log_safe_uri(gcs_uri)}")
+            logger.info(f"Calling video model for URIs: {[self._log_safe_uri(u) for u in gcs_uris]}")
+            key = self._video_cache_key(prompt, gcs_uris) if cache else None
+            cached = self._cache.get(key) if key else None
+            if cached is not None:
+                return cached
 
-            # Build the video part from GCS and send together with the prompt
-            video_part = Part.from_uri(gcs_uri, mime_type="video/mp4")
-            model = GenerativeModel(self.model_name)
+            # Build the video parts from GCS and send together with the prompt
+            parts = [prompt] + [_video_part(uri, "video/mp4") for uri in gcs_uris]
 
-            resp = model.generate_content(
-                [prompt, video_part],
+            resp = self._gm.generate_content(
+                parts,
                 generation_config={"temperature": 0.3},
             )
+            text = self._text_from_video_response(resp)
+            if key:
+                self._cache.put(key, text)
+            return text
 
-            text = getattr(resp, "text", None)
-            if not text and getattr(resp, "candidates", None):
-                # Fallback extraction for older SDK responses
-                try:
-                    text = resp.candidates[0].content.parts[0].text
-                except Exception:
-                    text = None
-
-            if not text or not str(text).strip():
-                raise ValueError("Empty response from Gemini video analysis")
+        except Exception as e:
+            logger.error(f"Video call failed: {e}")
+            raise
+    
+    async def acall_videos(self, prompt: str, gcs_uris: List[str], timeout: int = 60, cache: bool = False) -> str:
+        """Async twin of call_videos"""
+        try:
+            logger.info(f"Calling video model (async) for URIs: {[self._log_safe_uri(u) for u in gcs_uris]}")
+            key = self._video_cache_key(prompt, gcs_uris) if cache else None
+            cached = await asyncio.to_thread(self._cache.get, key) if key else None
+            if cached is not None:
+                return cached
+            parts = [prompt] + [_video_part(uri, "video/mp4") for uri in gcs_uris]
 
-            logger.info("Video analysis completed successfully")
-            return str(text).strip()
+            async with self._semaphore():
+                resp = await self._gm.generate_content_async(
+                    parts,
+                    generation_config={"temperature": 0.3},
+                )
+            text = self._text_from_video_response(resp)
+            if key:
+                await asyncio.to_thread(self._cache.put, key, text)
+            return text
 
         except Exception as e:
-            logger.error(f"Video call failed: {e}")
+            logger.error(f"Async video call failed: {e}")
             raise
     
+    def _text_from_video_response(self, resp) -> str:
+        """Extract and validate the text of a GenerativeModel response"""
+        text = getattr(resp, "text", None)
+        if not text and getattr(resp, "candidates", None):
+            # Fallback extraction for older SDK responses
+            try:
+                text = resp.candidates[0].content.parts[0].text
+            except Exception:
+                text = None
+
+        if not text or not str(text).strip():
+            raise ValueError("Empty response from Gemini video analysis")
+
+        logger.info("Video analysis completed successfully")
+        return str(text).strip()
+    
     def _log_safe_uri(self, gcs_uri: str) -> str:
         """Log GCS URI safely (only first 20 chars)"""
         return f"{gcs_uri[:20]}..." if len(gcs_uri) > 20 else gcs_uri
+
+@functools.lru_cache(maxsize=1)
+def get_llm_adapter() -> LLMAdapter:
+    """Process-wide default LLMAdapter (one Vertex client / channel per process, warmed up once)"""
+    return LLMAdapter(warmup=True)
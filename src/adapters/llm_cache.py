@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import hashlib
+import logging
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join("data", "cache", "llm_cache.sqlite")
+# Entries older than this (seconds) are treated as misses; LLM_CACHE_TTL overrides
+DEFAULT_TTL = 7 * 24 * 3600
+
+def make_key(*parts: str) -> str:
+    """Build a content-addressed cache key from the request parts (prompt, URI, ...)"""
+    return hashlib.blake2b("|".join(parts).encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """Persistent on-disk cache of LLM responses, backed by SQLite in WAL mode"""
+
+    def __init__(self, path: str = None, ttl: float = None):
+        self.path = path or os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.ttl = ttl if ttl is not None else float(os.getenv("LLM_CACHE_TTL", DEFAULT_TTL))
+        self._conn = None
+        # The connection is shared by worker threads (asyncio.to_thread callers)
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            cache_dir = os.path.dirname(self.path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL)"
+            )
+            # Databases created before the TTL column existed
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(llm_cache)")}
+            if "expires_at" not in columns:
+                conn.execute("ALTER TABLE llm_cache ADD COLUMN expires_at REAL")
+            conn.execute(
+                "DELETE FROM llm_cache WHERE COALESCE(expires_at, created_at + ?) <= ?",
+                (self.ttl, time.time()),
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss / expired entry"""
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT value FROM llm_cache WHERE key = ? AND COALESCE(expires_at, created_at + ?) > ?",
+                    (key, self.ttl, time.time()),
+                ).fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            # A broken cache must never block the real LLM call
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+
+    def put(self, key: str, value: str, ttl: Optional[float] = None):
+        """Store a response under key for ttl seconds (default self.ttl), replacing any previous value"""
+        try:
+            now = time.time()
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now + (ttl if ttl is not None else self.ttl)),
+                )
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
@@ -0,0 +1,102 @@
+import re
+import json
+import time
+import asyncio
+import hashlib
+import functools
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+def normalize_question(question: str) -> str:
+    """Canonical form used for cache lookups: case, punctuation and spacing are ignored"""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", (question or "").lower())).strip()
+
+def cache_key(question: str, child_info: Optional[str] = None, variant: str = "main", scope: str = "") -> str:
+    """Build the response-cache key for a (question, child_info) pair within a graph variant.
+    scope identifies the adapters that produce the answer (see adapter_scope), so results
+    from one model / catalog are never served to a caller using another.
+    """
+    child = normalize_question(child_info) if child_info else None
+    payload = json.dumps(
+        {"q": normalize_question(question), "child": child, "variant": variant, "scope": scope},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def adapter_scope(llm_adapter: Any, catalog_adapter: Any) -> str:
+    """Cache scope for an adapter pair: instance identity plus model name and catalog path"""
+    model = getattr(llm_adapter, "model_name", type(llm_adapter).__name__)
+    catalog = getattr(catalog_adapter, "catalog_path", type(catalog_adapter).__name__)
+    return f"{model}@{id(llm_adapter):x}|{catalog}@{id(catalog_adapter):x}"
+
+class ResponseCache:
+    """In-process LRU cache with per-entry TTL for full pipeline results"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss / expired entry"""
+        async with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.stats["misses"] += 1
+            return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store value under key, evicting the least recently used entry when full"""
+        async with self._lock:
+            self._data[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    async def clear(self):
+        async with self._lock:
+            self._data.clear()
+
+# Shared by every run_main_flow call in the process
+response_cache = ResponseCache()
+
+class SingleFlight:
+    """Collapse concurrent identical calls: followers await the leader's in-flight result"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run fn() once per key at a time; returns (result, shared) where shared marks a follower"""
+        task = self._inflight.get(key)
+        shared = task is not None
+        if not shared:
+            # The shared run is its own task, so no single caller's cancellation reaches it
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._done, key))
+        # shield: a cancelled caller (leader or follower) must not cancel the shared run
+        return await asyncio.shield(task), shared
+
+    def _done(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark retrieved so a failure nobody is still awaiting does not warn at GC time
+        if not task.cancelled():
+            task.exception()
+
+# In-flight main-flow runs, keyed like response_cache
+main_flow_inflight = SingleFlight()
@@ -0,0 +1,18 @@
+"""
+Argument parser factory shared by the CLI entrypoints
+"""
+
+import argparse
+
+
+def build_cli_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the Agentic Video QA CLI"""
+    parser = argparse.ArgumentParser(description="Agentic Video QA CLI")
+    # Optional positional 'mode' for legacy compatibility ('cli' only)
+    parser.add_argument('mode', nargs='?', choices=['cli'], help='Legacy mode specifier (must be "cli"). Can be omitted.', default=None)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--question", "-q", help="Question to ask")
+    source.add_argument("--batch-file", help="Answer every question in this file (one per line) non-interactively")
+    parser.add_argument("--child-info", default=None, help="Child name and clothing description used for every batch question")
+    parser.add_argument("--concurrency", type=int, default=8, help="Max batch questions processed at once (default: 8)")
+    return parser
@@ -0,0 +1,13 @@
+"""
+Result formatting shared by the CLI entrypoints
+"""
+
+from typing import Tuple
+
+from src.state import QAState
+
+
+def format_state_summary(state: QAState) -> Tuple[str, str, str]:
+    """Return (videos analyzed, refined question, final answer) display strings for a result state"""
+    videos = ", ".join(state.target_videos or ()) or "None"
+    return videos, state.target_question or "None", state.final_answer
@@ -7,11 +7,13 @@ Runs the main flow and handles follow-up questions interactively
 import asyncio
 import logging
 import sys
-from typing import List
-from src.graph import run_main_flow, run_graph
+from src.graph import run_main_flow
 from src.state import QAState, ConversationMessage
-from src.adapters.llm_adapter import LLMAdapter
-from src.adapters.catalog_adapter import CatalogAdapter
+from src.adapters.llm_adapter import get_llm_adapter
+from src.adapters.catalog_adapter import get_catalog_adapter
+from src.nodes.followup_advisor import run as followup_advisor
+from src.history import compact
+from src.cli_format import format_state_summary
 
 # Configure logging
 logging.basicConfig(
@@ -20,6 +22,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def _ainput(prompt: str) -> str:
+    """input() on a worker thread so background tasks keep running while the parent types"""
+    return await asyncio.to_thread(input, prompt)
+
 async def main():
     """Main CLI runner function"""
     
@@ -36,8 +42,8 @@ async def main():
     
     try:
         # Initialize adapters
-        llm_adapter = LLMAdapter()
-        catalog_adapter = CatalogAdapter()
+        llm_adapter = get_llm_adapter()
+        catalog_adapter = get_catalog_adapter()
         
         # Run main flow (up to composer) - this will start with child identification
         print("\n🔄 Starting analysis (will ask for child identification first)...")
@@ -50,36 +56,30 @@ async def main():
         # Check if we need child identification first
         if hasattr(result, 'waiting_for_child_info') and result.waiting_for_child_info:
             print(f"\n👶 {result.user_question}")
-            child_response = input("Your response: ").strip()
+            child_response = (await _ainput("Your response: ")).strip()
             
             # Update the state with child information
             result.child_info = child_response
             result.waiting_for_child_info = False
             
-            # Add to conversation history
-            conversation_history = [
-                ConversationMessage(role="user", content=user_question),
-                ConversationMessage(role="assistant", content=result.user_question),
-                ConversationMessage(role="user", content=child_response)
-            ]
-            
             # Now run the actual analysis with child info
             print("\n🔄 Running video analysis with child information...")
-            # Re-run main flow seeded with collected child info and history
+            # Re-run main flow seeded with the collected child info. The child-ID exchange is not
+            # passed as history: nothing downstream reads it, and history would bypass the response cache
             result = await run_main_flow(
                 user_question=user_question,
                 llm_adapter=llm_adapter,
                 catalog_adapter=catalog_adapter,
                 child_info=result.child_info,
                 original_question=result.original_question,
-                conversation_history=conversation_history
             )
         
         # Display results
-        print(f"\n📹 Videos analyzed: {', '.join(result.target_videos) if result.target_videos else 'None'}")
-        print(f"🎯 Refined question: {result.target_question if result.target_question else 'None'}")
+        videos_analyzed, refined_question, final_answer = format_state_summary(result)
+        print(f"\n📹 Videos analyzed: {videos_analyzed}")
+        print(f"🎯 Refined question: {refined_question}")
         print(f"\n💡 Final Answer:")
-        print(f"{result.final_answer}")
+        print(f"{final_answer}")
         
         # Handle follow-up questions
         conversation_history = [
@@ -89,7 +89,7 @@ async def main():
         
         while True:
             print("\n" + "=" * 80)
-            followup = input("\n❓ Follow-up question (or 'quit' to exit): ").strip()
+            followup = (await _ainput("\n❓ Follow-up question (or 'quit' to exit): ")).strip()
             
             if followup.lower() in ['quit', 'exit', 'q', '']:
                 print("👋 Goodbye!")
@@ -98,8 +98,9 @@ async def main():
             if followup:
                 print(f"\n🔄 Processing follow-up...")
                 
-                # Add follow-up to conversation history
+                # Add follow-up to conversation history, summarizing older turns once it grows long
                 conversation_history.append(ConversationMessage(role="user", content=followup))
+                conversation_history = await compact(conversation_history, llm_adapter)
                 
                 # Run followup_advisor
                 followup_state = QAState(
@@ -108,10 +109,9 @@ async def main():
                     conversation_history=conversation_history
                 )
                 
-                # Import and run followup_advisor directly
-                from src.nodes.followup_advisor import run as followup_advisor
-                # followup_advisor is synchronous, so call it directly without await
-                followup_result = followup_advisor(followup_state, llm_adapter)
+                # Run followup_advisor directly
+                # followup_advisor is async; await it so the LLM call does not block the loop
+                followup_result = await followup_advisor(followup_state, llm_adapter)
                 
                 # Display follow-up response
                 print(f"\n💡 Follow-up Response:")
@@ -128,5 +128,48 @@ async def main():
         print(f"\n❌ Error: {e}")
         sys.exit(1)
 
+async def run_batch(batch_file: str, child_info: str = None, concurrency: int = 8):
+    """Answer every question in batch_file (one per line) with bounded concurrency"""
+    with open(batch_file, "r") as f:
+        questions = [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+    if not questions:
+        print(f"No questions found in {batch_file}")
+        return
+    
+    llm_adapter = get_llm_adapter()
+    catalog_adapter = get_catalog_adapter()
+    sem = asyncio.Semaphore(max(1, concurrency))
+    
+    async def one(question: str) -> QAState:
+        async with sem:
+            return await run_main_flow(
+                user_question=question,
+                llm_adapter=llm_adapter,
+                catalog_adapter=catalog_adapter,
+                child_info=child_info,
+            )
+    
+    print(f"\n🔄 Running {len(questions)} questions (concurrency={concurrency})...")
+    results = await asyncio.gather(*(one(q) for q in questions), return_exceptions=True)
+    
+    for question, result in zip(questions, results):
+        print("\n" + "=" * 80)
+        print(f"🤔 Question: {question}")
+        if isinstance(result, Exception):
+            print(f"❌ Error: {result}")
+        elif result.waiting_for_child_info:
+            print("👶 Needs child identification; rerun with --child-info")
+        else:
+            videos_analyzed, _, final_answer = format_state_summary(result)
+            print(f"📹 Videos analyzed: {videos_analyzed}")
+            print(f"\n💡 Final Answer:")
+            print(f"{final_answer}")
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:  # uvloop is unavailable on Windows
+        uvloop = None
+    # Prefer uvloop's faster event loop when it is installed
+    runner = uvloop.run if uvloop is not None else asyncio.run
+    runner(main())
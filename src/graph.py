@@ -1,10 +1,12 @@
 import logging
 import asyncio
+import functools
 from typing import Dict, Any
 from langgraph.graph import StateGraph, END
 from src.state import QAState
-from src.adapters.llm_adapter import LLMAdapter
-from src.adapters.catalog_adapter import CatalogAdapter
+from src.adapters.llm_adapter import LLMAdapter, get_llm_adapter
+from src.adapters.catalog_adapter import CatalogAdapter, get_catalog_adapter
+from src.cache import adapter_scope, cache_key, response_cache, main_flow_inflight
 from src.nodes.child_identifier import run as child_identifier
 from src.nodes.video_picker import run as video_picker
 from src.nodes.question_refiner import run as question_refiner
@@ -17,109 +19,147 @@ from src.nodes.followup_advisor import run as followup_advisor
 
 logger = logging.getLogger(__name__)
 
+# Graph node name -> (node coroutine, whether it also takes the catalog adapter)
+NODE_TABLE = {
+    "child_identifier": (child_identifier, False),
+    "video_picker": (video_picker, True),
+    "question_refiner": (question_refiner, False),
+    "video_analyzers": (video_analyzers, True),
+    "composer": (composer, False),
+    "followup_advisor": (followup_advisor, False),
+    "transcript_builder": (transcript_builder, True),
+    "transcript_answerer": (transcript_answerer, False),
+    "transcript_router": (transcript_router, False),
+}
+
+# State fields each node writes. Wrappers return only these as a partial update, so
+# LangGraph touches just the changed channels (and the parallel video_picker /
+# question_refiner branches never write the same key)
+NODE_OUTPUTS = {
+    "child_identifier": ("user_question", "original_question", "waiting_for_child_info", "conversation_history"),
+    "video_picker": ("target_videos",),
+    "question_refiner": ("target_question",),
+    "video_analyzers": ("per_video_answers",),
+    "composer": ("final_answer", "followup_needed"),
+    "followup_advisor": ("followup_response",),
+    "transcript_builder": ("transcript_path",),
+    "transcript_answerer": ("transcript_can_answer", "transcript_answer", "per_video_answers"),
+    "transcript_router": ("transcript_prefer", "needs_transcript"),
+}
+
+FULL_GRAPH_NODES = list(NODE_TABLE)
+MAIN_FLOW_NODES = [name for name in NODE_TABLE if name not in ("followup_advisor", "transcript_router")]
+
+# Next node after transcript_answerer, keyed by "can the transcript answer this?"
+_TRANSCRIPT_ROUTE = {True: "composer", False: "video_analyzers"}
+
+# Conditional-edge functions only read state, so they live at module scope and are
+# shared by every graph built in the process
+def _after_child(state: QAState):
+    """If still waiting for child info, end; otherwise fan out to video_picker and question_refiner"""
+    return END if state.waiting_for_child_info else ["video_picker", "question_refiner"]
+
+def _after_transcript(state: QAState) -> str:
+    """Full graph: composer when the transcript answers (or is preferred), else video analyzers"""
+    # per_video_answers is pre-seeded by transcript_answerer on the composer route
+    return _TRANSCRIPT_ROUTE[state.transcript_prefer or state.transcript_can_answer]
+
+def _after_transcript_main(state: QAState) -> str:
+    """Main flow: composer only when the transcript can answer on its own"""
+    return _TRANSCRIPT_ROUTE[state.transcript_can_answer]
+
+def should_continue(state: QAState) -> str:
+    """Check if we should continue to followup_advisor (composer decides via followup_needed)"""
+    return "followup_advisor" if state.followup_needed else END
+
+async def _select_fields(node, fields, state: QAState, **adapters) -> Dict[str, Any]:
+    """Run a node and return only the given fields as a partial state update"""
+    result = await node(state, **adapters)
+    return {field: getattr(result, field) for field in fields}
+
+def make_wrappers(llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter) -> Dict[str, Any]:
+    """Bind the adapters to every node with functools.partial (no per-graph closures)"""
+    wrappers = {}
+    for name, (node, needs_catalog) in NODE_TABLE.items():
+        adapters = {"llm_adapter": llm_adapter}
+        if needs_catalog:
+            adapters["catalog_adapter"] = catalog_adapter
+        wrappers[name] = functools.partial(_select_fields, node, NODE_OUTPUTS[name], **adapters)
+    return wrappers
+
 def create_graph(llm_adapter: LLMAdapter = None, catalog_adapter: CatalogAdapter = None) -> StateGraph:
     """Create the LangGraph workflow for the agentic video QA system"""
     
     # Initialize adapters if not provided
     if llm_adapter is None:
-        llm_adapter = LLMAdapter()
+        llm_adapter = get_llm_adapter()
     if catalog_adapter is None:
-        catalog_adapter = CatalogAdapter()
+        catalog_adapter = get_catalog_adapter()
     
     # Create the graph
     workflow = StateGraph(QAState)
     
-    # Create wrapper functions that bind the adapters
-    async def child_identifier_wrapper(state: QAState) -> QAState:
-        # Await the async child_identifier node
-        return await child_identifier(state, llm_adapter)
-    
-    def video_picker_wrapper(state: QAState) -> QAState:
-        return video_picker(state, llm_adapter, catalog_adapter)
-    
-    def question_refiner_wrapper(state: QAState) -> QAState:
-        return question_refiner(state, llm_adapter)
-    
-    def video_analyzers_wrapper(state: QAState) -> QAState:
-        return video_analyzers(state, llm_adapter, catalog_adapter)
-    
-    def composer_wrapper(state: QAState) -> QAState:
-        return composer(state, llm_adapter)
-    
-    def followup_advisor_wrapper(state: QAState) -> QAState:
-        return followup_advisor(state, llm_adapter)
-    
-    def transcript_builder_wrapper(state: QAState) -> QAState:
-        return transcript_builder(state, llm_adapter, catalog_adapter)
-    
-    def transcript_answerer_wrapper(state: QAState) -> QAState:
-        return transcript_answerer(state, llm_adapter)
-    
-    def transcript_router_wrapper(state: QAState) -> QAState:
-        return transcript_router(state, llm_adapter)
-    
-    # Add nodes
-    workflow.add_node("child_identifier", child_identifier_wrapper)
-    workflow.add_node("video_picker", video_picker_wrapper)
-    workflow.add_node("question_refiner", question_refiner_wrapper)
-    workflow.add_node("video_analyzers", video_analyzers_wrapper)
-    workflow.add_node("composer", composer_wrapper)
-    workflow.add_node("followup_advisor", followup_advisor_wrapper)
-    workflow.add_node("transcript_builder", transcript_builder_wrapper)
-    workflow.add_node("transcript_answerer", transcript_answerer_wrapper)
-    workflow.add_node("transcript_router", transcript_router_wrapper)
+    # Add nodes (adapter-bound partials from NODE_TABLE)
+    wrappers = make_wrappers(llm_adapter, catalog_adapter)
+    for name in FULL_GRAPH_NODES:
+        workflow.add_node(name, wrappers[name])
     
     # Set entry point
     workflow.set_entry_point("child_identifier")
     
-    # Add edges (sequential flow) with conditional branch after child identification
-    def _after_child(state: QAState) -> str:
-        """If still waiting for child info, end; otherwise proceed to video_picker"""
-        if getattr(state, 'waiting_for_child_info', False):
-            return END
-        return "video_picker"
-    workflow.add_conditional_edges("child_identifier", _after_child)
-    workflow.add_edge("video_picker", "question_refiner")
-    # Transcript-first branch after question refinement
+    # Add edges with conditional branch after child identification
+    workflow.add_conditional_edges("child_identifier", _after_child, ["video_picker", "question_refiner", END])
+    # Transcript-first branch after question refinement (runs alongside video_picker)
     workflow.add_edge("question_refiner", "transcript_router")
-    workflow.add_edge("transcript_router", "transcript_builder")
+    # Join: transcript_builder waits for both the picked videos and the routing decision
+    workflow.add_edge(["video_picker", "transcript_router"], "transcript_builder")
     workflow.add_edge("transcript_builder", "transcript_answerer")
     
     # Conditional: if transcript can answer, go straight to composer; else go to video analyzers
-    def _after_transcript(state: QAState) -> str:
-        # Prefer transcript for activities/skills overview (non child-specific)
-        if getattr(state, 'transcript_prefer', False) or getattr(state, 'transcript_can_answer', False):
-            # per_video_answers is pre-seeded by transcript_answerer
-            return "composer"
-        return "video_analyzers"
     workflow.add_conditional_edges("transcript_answerer", _after_transcript)
     workflow.add_edge("video_analyzers", "composer")
     
     # Conditional edge for followup_advisor
-    def should_continue(state: QAState) -> str:
-        """Check if we should continue to followup_advisor"""
-        if state.conversation_history:
-            return "followup_advisor"
-        return END
-    
     workflow.add_conditional_edges("composer", should_continue)
     workflow.add_edge("followup_advisor", END)
     
     return workflow
 
+def _as_state(result) -> QAState:
+    """Wrap a graph result dict as QAState without re-validating it.
+    Channel values were already validated when each node produced them.
+    """
+    if isinstance(result, dict):
+        return QAState.model_construct(**result)
+    return result
+
+def _private_copy(result: QAState, initial_state: QAState) -> QAState:
+    """Copy a shared/cached result, carrying this call's history and request id.
+    Shared results only come from runs started without prior history, so every message
+    in result.conversation_history was appended by that run and is kept after this call's history.
+    """
+    return result.model_copy(
+        update={
+            "conversation_history": [*initial_state.conversation_history, *result.conversation_history],
+            "request_id": initial_state.request_id,
+        },
+        deep=True,
+    )
+
 async def run_graph(
     user_question: str,
     conversation_history: list = None,
     llm_adapter: LLMAdapter = None,
-    catalog_adapter: CatalogAdapter = None
+    catalog_adapter: CatalogAdapter = None,
+    use_cache: bool = True,
 ) -> QAState:
     """Run the complete graph workflow"""
     
     # Initialize adapters if not provided
     if llm_adapter is None:
-        llm_adapter = LLMAdapter()
+        llm_adapter = get_llm_adapter()
     if catalog_adapter is None:
-        catalog_adapter = CatalogAdapter()
+        catalog_adapter = get_catalog_adapter()
     
     # Create initial state
     initial_state = QAState(
@@ -127,9 +167,19 @@ async def run_graph(
         conversation_history=conversation_history or []
     )
     
-    # Create and compile graph
-    graph = create_graph(llm_adapter, catalog_adapter)
-    compiled_graph = graph.compile()
+    # Answers only depend on the question (and adapters) when there is no prior conversation to
+    # follow up on. The "full" variant keeps these results, which carry follow-up fields, apart
+    # from run_main_flow's "main" entries
+    use_cache = use_cache and not conversation_history
+    key = cache_key(user_question, variant="full", scope=adapter_scope(llm_adapter, catalog_adapter))
+    if use_cache:
+        cached = await response_cache.get(key)
+        if cached is not None:
+            logger.info(f"Graph cache hit for question: {user_question[:50]}... (stats={response_cache.stats})")
+            return _private_copy(cached, initial_state)
+    
+    # Compiled once per adapter pair and reused across requests
+    compiled_graph = get_compiled_graph(llm_adapter, catalog_adapter, "full")
     
     # Run the graph
     try:
@@ -144,13 +194,58 @@ async def run_graph(
         )
         logger.info("Graph execution completed successfully")
         # Ensure we return a QAState instance (compiled_graph may yield a dict)
-        if isinstance(result, dict):
-            result = QAState.parse_obj(result)
+        result = _as_state(result)
+        if use_cache and not result.waiting_for_child_info and result.final_answer:
+            await response_cache.set(key, result.model_copy(deep=True))
         return result
     except Exception as e:
         logger.error(f"Graph execution failed: {e}")
         raise
 
+def create_main_flow_graph(llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter) -> StateGraph:
+    """Create the main-flow workflow (child identification up to composer, no followup)"""
+    
+    # Create graph for main flow only
+    workflow = StateGraph(QAState)
+    
+    wrappers = make_wrappers(llm_adapter, catalog_adapter)
+    for name in MAIN_FLOW_NODES:
+        workflow.add_node(name, wrappers[name])
+    
+    workflow.set_entry_point("child_identifier")
+    # Conditional branch: if waiting for child info, stop; otherwise run picker and refiner in parallel
+    workflow.add_conditional_edges("child_identifier", _after_child, ["video_picker", "question_refiner", END])
+    # Transcript-first branch once both parallel branches have finished
+    workflow.add_edge(["video_picker", "question_refiner"], "transcript_builder")
+    workflow.add_edge("transcript_builder", "transcript_answerer")
+    workflow.add_conditional_edges("transcript_answerer", _after_transcript_main)
+    workflow.add_edge("video_analyzers", "composer")
+    
+    return workflow
+
+@functools.lru_cache(maxsize=4)
+def get_compiled_graph(llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter, variant: str = "full"):
+    """Build and compile a graph variant ("full" or "main") once per adapter pair"""
+    builders = {"full": create_graph, "main": create_main_flow_graph}
+    logger.info(f"Compiling {variant} graph")
+    return builders[variant](llm_adapter, catalog_adapter).compile()
+
+async def _run_main_flow_direct(state: QAState, llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter) -> QAState:
+    """Main flow as direct awaits; same node order and branching as create_main_flow_graph"""
+    state = await child_identifier(state, llm_adapter)
+    if state.waiting_for_child_info:
+        return state
+    # Independent nodes writing disjoint fields (target_videos / target_question)
+    await asyncio.gather(
+        video_picker(state, llm_adapter, catalog_adapter),
+        question_refiner(state, llm_adapter),
+    )
+    state = await transcript_builder(state, llm_adapter, catalog_adapter)
+    state = await transcript_answerer(state, llm_adapter)
+    if not state.transcript_can_answer:
+        state = await video_analyzers(state, llm_adapter, catalog_adapter)
+    return await composer(state, llm_adapter)
+
 async def run_main_flow(
     user_question: str,
     llm_adapter: LLMAdapter = None,
@@ -158,14 +253,15 @@ async def run_main_flow(
     child_info: str = None,
     original_question: str = None,
     conversation_history: list = None,
+    use_cache: bool = True,
 ) -> QAState:
     """Run the main flow (up to composer) without followup"""
     
     # Initialize adapters if not provided
     if llm_adapter is None:
-        llm_adapter = LLMAdapter()
+        llm_adapter = get_llm_adapter()
     if catalog_adapter is None:
-        catalog_adapter = CatalogAdapter()
+        catalog_adapter = get_catalog_adapter()
     
     # Create initial state with optional pre-set fields
     initial_state = QAState(user_question=user_question)
@@ -177,75 +273,53 @@ async def run_main_flow(
     if conversation_history is not None:
         initial_state.conversation_history = conversation_history
     
-    # Create graph for main flow only
-    workflow = StateGraph(QAState)
-    
-    # Create wrapper functions that bind the adapters
-    async def child_identifier_wrapper(state: QAState) -> QAState:
-        # Await the async child_identifier node
-        return await child_identifier(state, llm_adapter)
-    
-    def video_picker_wrapper(state: QAState) -> QAState:
-        return video_picker(state, llm_adapter, catalog_adapter)
-    
-    def question_refiner_wrapper(state: QAState) -> QAState:
-        return question_refiner(state, llm_adapter)
-    
-    def video_analyzers_wrapper(state: QAState) -> QAState:
-        return video_analyzers(state, llm_adapter, catalog_adapter)
-
-    def transcript_builder_wrapper(state: QAState) -> QAState:
-        return transcript_builder(state, llm_adapter, catalog_adapter)
-
-    def transcript_answerer_wrapper(state: QAState) -> QAState:
-        return transcript_answerer(state, llm_adapter)
-    
-    def composer_wrapper(state: QAState) -> QAState:
-        return composer(state, llm_adapter)
-    
-    workflow.add_node("child_identifier", child_identifier_wrapper)
-    workflow.add_node("video_picker", video_picker_wrapper)
-    workflow.add_node("question_refiner", question_refiner_wrapper)
-    workflow.add_node("video_analyzers", video_analyzers_wrapper)
-    workflow.add_node("composer", composer_wrapper)
-    workflow.add_node("transcript_builder", transcript_builder_wrapper)
-    workflow.add_node("transcript_answerer", transcript_answerer_wrapper)
-    
-    workflow.set_entry_point("child_identifier")
-    # Conditional branch: if waiting for child info, stop; otherwise proceed
-    def _after_child_main(state: QAState) -> str:
-        if getattr(state, 'waiting_for_child_info', False):
-            return END
-        return "video_picker"
-    workflow.add_conditional_edges("child_identifier", _after_child_main)
-    workflow.add_edge("video_picker", "question_refiner")
-    # Transcript-first branch after question refinement
-    workflow.add_edge("question_refiner", "transcript_builder")
-    workflow.add_edge("transcript_builder", "transcript_answerer")
-    def _after_transcript_main(state: QAState) -> str:
-        if getattr(state, 'transcript_can_answer', False):
-            return "composer"
-        return "video_analyzers"
-    workflow.add_conditional_edges("transcript_answerer", _after_transcript_main)
-    workflow.add_edge("video_analyzers", "composer")
-    
-    # Compile and run
-    compiled_graph = workflow.compile()
+    # Identical (question, child) pairs on the same adapters reuse the previous full pipeline
+    # result, but only without prior conversation (the key does not cover history)
+    use_cache = use_cache and not conversation_history
+    key = cache_key(
+        original_question or user_question,
+        child_info,
+        variant="main",
+        scope=adapter_scope(llm_adapter, catalog_adapter),
+    )
+    if use_cache:
+        cached = await response_cache.get(key)
+        if cached is not None:
+            logger.info(f"Main flow cache hit for question: {user_question[:50]}... (stats={response_cache.stats})")
+            return _private_copy(cached, initial_state)
+    
+    async def _execute() -> QAState:
+        if child_info is not None:
+            # Child already identified: the flow is a fixed chain, so skip graph dispatch
+            result = await _run_main_flow_direct(initial_state, llm_adapter, catalog_adapter)
+        else:
+            # Compiled once per adapter pair and reused across requests
+            compiled_graph = get_compiled_graph(llm_adapter, catalog_adapter, "main")
+            result = await compiled_graph.ainvoke(
+                initial_state,
+                config={
+                    "configurable": {
+                        "thread_id": initial_state.request_id
+                    }
+                }
+            )
+        # Ensure we return a QAState instance (compiled_graph may yield a dict)
+        result = _as_state(result)
+        # Only completed answers are worth caching (not the child-identification prompt)
+        if use_cache and not result.waiting_for_child_info and result.final_answer:
+            await response_cache.set(key, result.model_copy(deep=True))
+        return result
     
     try:
         logger.info(f"Starting main flow execution for question: {user_question[:50]}...")
-        result = await compiled_graph.ainvoke(
-            initial_state,
-            config={
-                "configurable": {
-                    "thread_id": initial_state.request_id
-                }
-            }
-        )
+        if not use_cache:
+            return await _execute()
+        # Concurrent identical requests share one pipeline run
+        result, shared = await main_flow_inflight.do(key, _execute)
+        if shared:
+            logger.info("Main flow joined an in-flight run for the same question")
+            return _private_copy(result, initial_state)
         logger.info("Main flow execution completed successfully")
-        # Ensure we return a QAState instance (compiled_graph may yield a dict)
-        if isinstance(result, dict):
-            result = QAState.parse_obj(result)
         return result
     except Exception as e:
         logger.error(f"Main flow execution failed: {e}")
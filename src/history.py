@@ -0,0 +1,52 @@
+import hashlib
+import logging
+from typing import Dict, List
+
+from src.state import ConversationMessage
+from src.adapters.llm_adapter import LLMAdapter
+from src.prompt_loader import load_prompt
+
+logger = logging.getLogger(__name__)
+
+_SUMMARY_PREFIX = "Summary of the earlier conversation: "
+# Summaries keyed by a hash of the slice they cover, so re-compacting the same turns is free
+_SUMMARY_CACHE: Dict[str, str] = {}
+_SUMMARY_CACHE_MAX = 256
+
+def _slice_key(messages: List[ConversationMessage]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for msg in messages:
+        h.update(f"{msg.role}\x1f{msg.content}\x1e".encode("utf-8"))
+    return h.hexdigest()
+
+async def compact(
+    history: List[ConversationMessage],
+    llm_adapter: LLMAdapter,
+    keep: int = 6,
+    max_len: int = 12,
+) -> List[ConversationMessage]:
+    """
+    Bound conversation history: once it exceeds max_len messages, everything but the
+    last `keep` is folded into a single assistant summary message.
+    """
+    if len(history) <= max_len:
+        return history
+
+    older, recent = history[:-keep], history[-keep:]
+    key = _slice_key(older)
+    summary = _SUMMARY_CACHE.get(key)
+    if summary is None:
+        try:
+            prompt_template = load_prompt("prompts/history_summary.txt")
+            transcript = "\n".join(f"{msg.role}: {msg.content}" for msg in older)
+            summary = await llm_adapter.acall_text(transcript, temperature=0.0, system=prompt_template)
+        except Exception as e:
+            # Fallback: drop the oldest turns rather than grow the prompt without bound
+            logger.warning(f"history compaction summary failed: {e}, truncating instead")
+            return recent
+        if len(_SUMMARY_CACHE) >= _SUMMARY_CACHE_MAX:
+            _SUMMARY_CACHE.pop(next(iter(_SUMMARY_CACHE)))
+        _SUMMARY_CACHE[key] = summary
+
+    logger.info(f"Compacted {len(older)} history messages into a summary")
+    return [ConversationMessage(role="assistant", content=_SUMMARY_PREFIX + summary)] + recent
@@ -1,16 +1,39 @@
+import re
 import logging
-from src.state import QAState
+from time import perf_counter_ns
+from src.state import QAState, ConversationMessage
 from src.adapters.llm_adapter import LLMAdapter
+from src.prompt_loader import load_prompt
 
 logger = logging.getLogger(__name__)
 
+# Cheap gates tried before the LLM classifier. Only unambiguous wording short-circuits: the parent
+# naming their own child needs a specific child, class-wide activities/menus do not. Words like
+# "happy" or "finish" fit class-wide questions too, so those are left to child_identifier_classify.txt
+_CHILD_HINTS = re.compile(
+    r"\b(?:my|our) (?:son|daughter|child|kid|boy|girl|little one)\b",
+    re.IGNORECASE,
+)
+_NON_CHILD = re.compile(
+    r"\bwhat did (?:they|the (?:class|kids|children)) do\b|\b(?:menu|schedule|curriculum|weather)\b",
+    re.IGNORECASE,
+)
+
+def _heuristic_requires_child(question: str):
+    """True/False when the question clearly does/doesn't need a specific child, None when ambiguous"""
+    if _CHILD_HINTS.search(question):
+        return True
+    if _NON_CHILD.search(question):
+        return False
+    return None
+
 async def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
     """
     Node: child_identifier
     Input: user_question (original question)
     Output: child_info (name and clothing description)
     """
-    start_time = __import__('time').time()
+    t0 = perf_counter_ns()
     
     try:
         # If child info has already been provided, restore and proceed
@@ -18,39 +41,37 @@ async def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
             state.waiting_for_child_info = False
             if state.original_question:
                 state.user_question = state.original_question
-            duration_ms = int((__import__('time').time() - start_time) * 1000)
+            duration_ms = (perf_counter_ns() - t0) // 1_000_000
             logger.info(f"child_identifier completed in {duration_ms}ms, child info available, proceeding with original question")
         else:
-            # Determine if child identification is needed via LLM classification
-            requires_child = True
-            try:
-                # Load classification prompt template
-                with open("prompts/child_identifier_classify.txt", "r") as f:
-                    classify_template = f.read()
-                classification_prompt = classify_template.format(question=state.user_question)
-                classification = llm_adapter.call_json(classification_prompt)
-                requires_child = bool(classification.get("requires_child", True))
-            except Exception as cls_e:
-                logger.warning(f"child_identifier classification failed: {cls_e}, defaulting to requiring child info")
-                requires_child = True
+            # Determine if child identification is needed; the LLM classifies only ambiguous questions
+            requires_child = _heuristic_requires_child(state.user_question or "")
+            if requires_child is None:
+                try:
+                    # Load classification prompt template
+                    classify_template = load_prompt("prompts/child_identifier_classify.txt")
+                    classification_prompt = classify_template.format(question=state.user_question)
+                    classification = await llm_adapter.acall_json(classification_prompt)
+                    requires_child = bool(classification.get("requires_child", True))
+                except Exception as cls_e:
+                    logger.warning(f"child_identifier classification failed: {cls_e}, defaulting to requiring child info")
+                    requires_child = True
 
             if requires_child:
                 # Prompt user for child identification using template
-                with open("prompts/child_identifier.txt", "r") as f:
-                    child_question = f.read().strip()
+                child_question = load_prompt("prompts/child_identifier.txt").strip()
                 state.original_question = state.user_question
                 state.user_question = child_question
-                from src.state import ConversationMessage
                 if not getattr(state, 'conversation_history', None):
                     state.conversation_history = []
                 state.conversation_history.append(ConversationMessage(role="assistant", content=child_question))
                 state.waiting_for_child_info = True
-                duration_ms = int((__import__('time').time() - start_time) * 1000)
+                duration_ms = (perf_counter_ns() - t0) // 1_000_000
                 logger.info(f"child_identifier completed in {duration_ms}ms, requesting child identification")
             else:
                 # No child identification needed, proceed
                 state.waiting_for_child_info = False
-                duration_ms = int((__import__('time').time() - start_time) * 1000)
+                duration_ms = (perf_counter_ns() - t0) // 1_000_000
                 logger.info(f"child_identifier completed in {duration_ms}ms, child identification not required, proceeding")
     except Exception as e:
         logger.error(f"child_identifier failed: {e}")
@@ -1,34 +1,42 @@
 import logging
+from time import perf_counter_ns
 from src.state import QAState
 from src.adapters.llm_adapter import LLMAdapter
+from src.prompt_loader import load_prompt
 
 logger = logging.getLogger(__name__)
 
-def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
+async def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
     """
     Node: composer
     Input: user_question, per_video_answers
-    Output: final_answer (synthesized answer)
+    Output: final_answer (synthesized answer), followup_needed
     """
-    start_time = __import__('time').time()
+    t0 = perf_counter_ns()
+    
+    # Follow-up only when the latest history turn is an open parent message other than
+    # the question being answered now (deterministic, no extra LLM call)
+    last = state.conversation_history[-1] if state.conversation_history else None
+    state.followup_needed = bool(last and last.role == "user" and last.content != state.user_question)
     
     try:
         # Load prompt
-        with open("prompts/composer.txt", "r") as f:
-            prompt_template = f.read()
+        prompt_template = load_prompt("prompts/composer.txt")
         
         # Build prompt with video answers
-        video_answers_str = "\n".join([f"Video {vid}: {answer}" for vid, answer in state.per_video_answers.items()])
+        video_answers_str = "\n".join(f"Video {vid}: {answer}" for vid, answer in state.per_video_answers.items())
         
-        prompt = f"{prompt_template}\n\nOriginal question: {state.user_question}\n\nVideo answers:\n{video_answers_str}"
+        # Static instructions go in the system turn so they form a reusable prefix
+        prompt = f"Original question: {state.user_question}\n\nVideo answers:\n{video_answers_str}"
         
         # Call LLM for text response
-        response = llm_adapter.call_text(prompt, temperature=0.7)
+        response = await llm_adapter.acall_text(prompt, temperature=0.7, system=prompt_template)
         
         # Clean and validate response
-        if response and len(response.strip()) > 0:
+        answer = response.strip() if response else ""
+        if answer:
             # Rely on prompt to enforce length/format; no hard truncation here
-            state.final_answer = response.strip()
+            state.final_answer = answer
         else:
             # Fallback: concatenate video answers
             logger.warning("Empty response from composer, using fallback")
@@ -43,8 +51,8 @@ def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
                 state.final_answer = "I couldn't find enough evidence in the available videos to answer your question."
         
         # Log success
-        duration_ms = int((__import__('time').time() - start_time) * 1000)
-        logger.info(f"composer completed in {duration_ms}ms, output_fields_set: ['final_answer']")
+        duration_ms = (perf_counter_ns() - t0) // 1_000_000
+        logger.info(f"composer completed in {duration_ms}ms, output_fields_set: ['final_answer', 'followup_needed']")
         
     except Exception as e:
         logger.error(f"composer failed: {e}")
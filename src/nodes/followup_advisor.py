@@ -1,35 +1,32 @@
 import logging
+from time import perf_counter_ns
 from src.state import QAState
 from src.adapters.llm_adapter import LLMAdapter
+from src.prompt_loader import load_prompt
 
 logger = logging.getLogger(__name__)
 
-def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
+async def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
     """
     Node: followup_advisor
     Input: user_question, final_answer, conversation_history
     Output: followup_response (conversational response with actionable advice)
     """
-    start_time = __import__('time').time()
+    t0 = perf_counter_ns()
     
     try:
         # Load prompt
-        with open("prompts/followup_advisor.txt", "r") as f:
-            prompt_template = f.read()
+        prompt_template = load_prompt("prompts/followup_advisor.txt")
         
         # Format conversation history
-        history_str = ""
-        if state.conversation_history:
-            history_lines = []
-            for msg in state.conversation_history:
-                history_lines.append(f"{msg.role}: {msg.content}")
-            history_str = "\n".join(history_lines)
+        history_str = "\n".join(f"{msg.role}: {msg.content}" for msg in state.conversation_history or ())
         
-        # Build prompt
-        prompt = f"{prompt_template}\n\nOriginal question: {state.user_question}\n\nFinal answer: {state.final_answer}\n\nConversation history:\n{history_str}"
+        # Static instructions go in the system block so the prefix is identical every turn;
+        # only the per-turn content (with the growing history last) changes
+        prompt = f"Original question: {state.user_question}\n\nFinal answer: {state.final_answer}\n\nConversation history:\n{history_str}"
         
-        # Call LLM for text response
-        response = llm_adapter.call_text(prompt, temperature=0.7)
+        # Call LLM for text response (awaited so the event loop stays free)
+        response = await llm_adapter.acall_text(prompt, temperature=0.7, system=prompt_template)
         
         # Clean and validate response
         if response and len(response.strip()) > 0:
@@ -41,7 +38,7 @@ def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
             state.followup_response = "I'd be happy to help further! Could you please provide more specific details about what you'd like to know or what actions you'd like guidance on?"
         
         # Log success
-        duration_ms = int((__import__('time').time() - start_time) * 1000)
+        duration_ms = (perf_counter_ns() - t0) // 1_000_000
         logger.info(f"followup_advisor completed in {duration_ms}ms, output_fields_set: ['followup_response']")
         
     except Exception as e:
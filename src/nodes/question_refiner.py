@@ -1,34 +1,49 @@
+import re
 import logging
+from time import perf_counter_ns
 from src.state import QAState
 from src.adapters.llm_adapter import LLMAdapter
+from src.prompt_loader import load_prompt
 
 logger = logging.getLogger(__name__)
 
-def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
+# A single question sentence: no inner sentence terminators, ends with '?'
+_SIMPLE_Q = re.compile(r"^[^.?!]+\?$")
+_SIMPLE_Q_MAX_WORDS = 20
+
+async def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
     """
     Node: question_refiner
     Input: user_question
     Output: target_question (refined question for per-video analysis)
     """
-    start_time = __import__('time').time()
+    t0 = perf_counter_ns()
     
     try:
+        # Use original question if available, otherwise use current question
+        question_to_use = state.original_question or state.user_question
+        
+        # Short, well-formed questions need no rewrite unless there is a child description to work in
+        candidate = question_to_use.strip()
+        if (not state.child_info and not state.force_refine
+                and len(candidate.split()) <= _SIMPLE_Q_MAX_WORDS and _SIMPLE_Q.match(candidate)):
+            state.target_question = candidate
+            duration_ms = (perf_counter_ns() - t0) // 1_000_000
+            logger.info(f"question_refiner completed in {duration_ms}ms, simple question used as-is")
+            return state
+        
         # Load prompt
-        with open("prompts/question_refiner.txt", "r") as f:
-            prompt_template = f.read()
+        prompt_template = load_prompt("prompts/question_refiner.txt")
         
         # Build prompt with child information if available
         child_context = ""
-        if hasattr(state, 'child_info') and state.child_info:
+        if state.child_info:
             child_context = f"\n\nChild Information: {state.child_info}"
         
-        # Use original question if available, otherwise use current question
-        question_to_use = getattr(state, 'original_question', state.user_question)
-        
         prompt = f"{prompt_template}\n\nOriginal question: {question_to_use}{child_context}"
         
         # Call LLM for text response
-        response = llm_adapter.call_text(prompt, temperature=0.7)
+        response = await llm_adapter.acall_text(prompt, temperature=0.7)
         
         # Clean and validate response
         if response and len(response.strip()) > 0:
@@ -47,7 +62,7 @@ def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
             state.target_question = state.user_question
         
         # Log success
-        duration_ms = int((__import__('time').time() - start_time) * 1000)
+        duration_ms = (perf_counter_ns() - t0) // 1_000_000
         logger.info(f"question_refiner completed in {duration_ms}ms, output_fields_set: ['target_question']")
         
     except Exception as e:
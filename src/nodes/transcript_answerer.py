@@ -1,71 +1,90 @@
-import json
+import os
 import logging
-from typing import Any, Dict
+from time import perf_counter_ns
+import functools
+from typing import Any, Dict, Tuple
 
+import orjson
 from src.state import QAState
 from src.adapters.llm_adapter import LLMAdapter
+from src.prompt_loader import load_prompt
 
 logger = logging.getLogger(__name__)
 
-def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
+# Model verdicts keyed by (path, mtime_ns, question, child_info): repeat questions against an
+# unchanged transcript skip the file read and the LLM call
+_ANSWER_CACHE: Dict[Tuple, Dict[str, Any]] = {}
+_ANSWER_CACHE_MAX = 256
+
+@functools.lru_cache(maxsize=32)
+def _load_transcript(path: str, mtime_ns: int) -> Tuple[bool, str]:
+    """Return (is_json, prompt-ready transcript text); re-read only when the file changes"""
+    with open(path, "rb") as f:
+        content = f.read()
+    # transcript_builder already writes compact JSON, so the file text goes into the prompt as-is.
+    # Only content that actually parses gets the JSON label; a corrupt/truncated file is sent as text
+    is_json = False
+    if content.lstrip()[:1] in (b"{", b"["):
+        try:
+            orjson.loads(content)
+            is_json = True
+        except orjson.JSONDecodeError:
+            logger.warning(f"transcript_answerer: {path} is not valid JSON; treating it as text")
+    return is_json, content.decode("utf-8")
+
+async def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
     """
     Node: transcript_answerer
     Input: target_question, transcript_path
     Output: transcript_can_answer, transcript_answer (and possibly per_video_answers for composer)
     """
-    start_ts = __import__('time').time()
+    t0 = perf_counter_ns()
     try:
-        if not state.transcript_path:
+        if not state.needs_transcript:
+            logger.info("transcript_answerer: router marked question as video-only; skipping")
+            return state
+        transcript_path = state.transcript_path
+        if not transcript_path:
             logger.info("transcript_answerer: no transcript available; skipping")
             return state
 
-        # Read transcript file; support JSON or text
-        is_json = state.transcript_path.endswith('.json')
-        transcript_payload = None
-        with open(state.transcript_path, "r", encoding="utf-8") as f:
-            content = f.read()
-            if is_json:
-                try:
-                    transcript_payload = json.loads(content)
-                except Exception:
-                    is_json = False  # fallback to text embedding if JSON parse fails
-            if not is_json:
-                transcript_payload = content
+        child_info = state.child_info
+        mtime_ns = os.stat(transcript_path).st_mtime_ns
+        cache_key = (transcript_path, mtime_ns, state.target_question, child_info)
+        result = _ANSWER_CACHE.get(cache_key)
+        if result is None:
+            # Read transcript file; support JSON or text
+            is_json, transcript_str = _load_transcript(transcript_path, mtime_ns)
 
-        # Build prompt
-        with open("prompts/transcript_answerer.txt", "r") as f:
-            template = f.read()
+            # Build prompt
+            template = load_prompt("prompts/transcript_answerer.txt")
+            child_context = f"\nChild information: {child_info}" if child_info else ""
+            transcript_label = "Transcript JSON" if is_json else "Transcript (text)"
 
-        child_context = ""
-        if getattr(state, 'child_info', None):
-            child_context = f"\nChild information: {state.child_info}"
-
-        if is_json:
-            transcript_str = json.dumps(transcript_payload, ensure_ascii=False, separators=(",", ":"))
-            transcript_label = "Transcript JSON"
-        else:
-            transcript_str = transcript_payload
-            transcript_label = "Transcript (text)"
-
-        prompt = (
-            f"{template}\n\nRefined question: {state.target_question}{child_context}\n\n{transcript_label}:\n" + transcript_str
-        )
+            # Template (system) and transcript are stable across questions for the same day; keep them
+            # ahead of the per-question part so the provider can reuse the cached prefix
+            prompt = (
+                f"{transcript_label}:\n" + transcript_str + f"\n\nRefined question: {state.target_question}{child_context}"
+            )
 
-        result = llm_adapter.call_json(prompt, temperature=0.0)
+            result = await llm_adapter.acall_json(prompt, temperature=0.0, system=template)
+            if len(_ANSWER_CACHE) >= _ANSWER_CACHE_MAX:
+                _ANSWER_CACHE.pop(next(iter(_ANSWER_CACHE)))
+            _ANSWER_CACHE[cache_key] = result
         can_answer_flag = bool(result.get("can_answer", False))
         confidence = float(result.get("confidence", 0.0))
-        prefer = bool(getattr(state, 'transcript_prefer', False))
-        can_answer = (can_answer_flag and (confidence >= 0.6)) or prefer
+        can_answer = (can_answer_flag and (confidence >= 0.6)) or state.transcript_prefer
+        answer = (result.get("answer", "") or "").strip()
         state.transcript_can_answer = can_answer
-        state.transcript_answer = (result.get("answer", "") or "").strip()
+        state.transcript_answer = answer
 
-        if can_answer and state.transcript_answer:
+        if can_answer and answer:
             # Feed through composer path by setting per_video_answers to use transcript
-            state.per_video_answers = {"transcript": state.transcript_answer}
+            state.per_video_answers = {"transcript": answer}
         
-        duration_ms = int((__import__('time').time() - start_ts) * 1000)
+        duration_ms = (perf_counter_ns() - t0) // 1_000_000
         logger.info(
-            f"transcript_answerer completed in {duration_ms}ms, can_answer={state.transcript_can_answer}"
+            f"transcript_answerer completed in {duration_ms}ms, can_answer={can_answer}"
         )
         return state
 
@@ -1,16 +1,26 @@
-import json
 import os
+import asyncio
+import hashlib
 from datetime import datetime
 import logging
-from typing import Dict
+from time import perf_counter_ns
+from typing import Dict, List
+
+import orjson
 
 from src.state import QAState
 from src.adapters.llm_adapter import LLMAdapter
 from src.adapters.catalog_adapter import CatalogAdapter
+from src.prompt_loader import load_prompt
 
 logger = logging.getLogger(__name__)
 
 TRANSCRIPT_DIR = os.path.join("data", "transcripts")
+# Max section calls in flight at once
+MAX_CONCURRENT_SECTIONS = 4
+# Videos sent per multimodal call; >1 cuts request count under tight quotas at the cost of
+# per-video isolation (a failed batch is retried one video at a time)
+SECTIONS_PER_CALL = max(1, int(os.getenv("TRANSCRIPT_SECTIONS_PER_CALL", "1")))
 
 def _ensure_dir(path: str):
     try:
@@ -19,11 +29,16 @@ def _ensure_dir(path: str):
         # Directory may already exist or be created by another process
         pass
 
-def _load_prompt() -> str:
-    with open("prompts/transcript_full_day.txt", "r") as f:
-        return f.read()
+def _meta_ctx(video_id: str, meta) -> str:
+    """Light metadata context for one video"""
+    return (
+        f"\nVideo ID: {video_id}\n"
+        f"Session: {meta.get('session-type', 'Unknown')}\n"
+        f"Start: {meta.get('start-time', 'Unknown')}  End: {meta.get('end-time', 'Unknown')}\n"
+        f"Description: {meta.get('act-description', 'No description')}\n"
+    )
 
-def _build_section_for_video(
+async def _build_section_for_video(
     video_id: str,
     state: QAState,
     llm: LLMAdapter,
@@ -31,59 +46,79 @@ def _build_section_for_video(
 ) -> Dict:
     meta = catalog.get_metadata(video_id)
     gcs_uri = meta.get("gcs_uri")
-    prompt_template = _load_prompt()
-    # Provide light metadata context to the model
-    meta_ctx = (
-        f"\nVideo ID: {video_id}\n"
-        f"Session: {meta.get('session-type', 'Unknown')}\n"
-        f"Start: {meta.get('start-time', 'Unknown')}  End: {meta.get('end-time', 'Unknown')}\n"
-        f"Description: {meta.get('act-description', 'No description')}\n"
-    )
-    prompt = prompt_template + "\n\n" + meta_ctx
-    text = llm.call_video(prompt=prompt, gcs_uri=gcs_uri)
+    prompt_template = load_prompt("prompts/transcript_full_day.txt")
+    prompt = prompt_template + "\n\n" + _meta_ctx(video_id, meta)
+    text = await llm.acall_video(prompt=prompt, gcs_uri=gcs_uri, cache=True)
     try:
-        section = json.loads(text)
+        section = orjson.loads(text)
         return section
     except Exception as e:
         logger.warning(f"Transcript section not JSON for {video_id}; storing fallback text. Error: {e}")
         return {"activity": text[:200], "skills": [], "students": [], "distress_events": [], "evidence_times": []}
 
-def run(state: QAState, llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter) -> QAState:
+async def _build_sections_for_batch(
+    video_ids: List[str],
+    state: QAState,
+    llm: LLMAdapter,
+    catalog: CatalogAdapter,
+) -> Dict[str, Dict]:
+    """One multimodal call for several videos; raises unless every video gets a section"""
+    metas = [catalog.get_metadata(vid) for vid in video_ids]
+    prompt_template = load_prompt("prompts/transcript_full_day_batch.txt")
+    prompt = prompt_template + "\n\n" + "".join(_meta_ctx(vid, meta) for vid, meta in zip(video_ids, metas))
+    text = await llm.acall_videos(prompt=prompt, gcs_uris=[meta.get("gcs_uri") for meta in metas], cache=True)
+    sections = orjson.loads(text)
+    missing = [vid for vid in video_ids if not isinstance(sections.get(vid), dict)]
+    if missing:
+        raise ValueError(f"batched transcript response missing sections for {missing}")
+    return {vid: sections[vid] for vid in video_ids}
+
+async def run(state: QAState, llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter) -> QAState:
     """
     Node: transcript_builder
     Input: target_videos (from picker)
     Output: transcript_path (JSON file for the day combining per-video sections)
     """
-    start_ts = __import__('time').time()
+    t0 = perf_counter_ns()
 
     try:
         if not state.target_videos:
             logger.info("transcript_builder: no target_videos; skipping")
             return state
+        if not state.needs_transcript:
+            logger.info("transcript_builder: router marked question as video-only; skipping")
+            return state
 
         _ensure_dir(TRANSCRIPT_DIR)
         date_str = datetime.now().strftime("%Y-%m-%d")
-        json_out_path = os.path.join(TRANSCRIPT_DIR, f"transcript_{date_str}.json")
+        # Content-addressed: a different video set or prompt version gets its own file instead of reusing a stale one
+        prompt_version = state.transcript_prompt_version or "v1"
+        build_key = hashlib.sha1(
+            f"{','.join(sorted(state.target_videos))}|{prompt_version}|{date_str}".encode("utf-8")
+        ).hexdigest()[:12]
+        json_out_path = os.path.join(TRANSCRIPT_DIR, f"transcript_{date_str}_{build_key}.json")
 
         # Prefer a pre-generated text transcript if present; else reuse today's JSON if exists
         try:
-            candidates = [
-                os.path.join(TRANSCRIPT_DIR, fn)
-                for fn in os.listdir(TRANSCRIPT_DIR)
-                if fn.startswith("transcript_") and (fn.endswith(".txt") or fn.endswith(".json"))
-            ]
-            latest = max(candidates, key=lambda p: os.path.getmtime(p)) if candidates else None
+            # scandir's DirEntry caches stat results, so this is one directory walk plus one stat per match
+            with os.scandir(TRANSCRIPT_DIR) as it:
+                candidates = [
+                    (e.path, e.stat().st_mtime)
+                    for e in it
+                    if e.name.startswith("transcript_") and e.name.endswith((".txt", ".json")) and e.is_file()
+                ]
+            latest = max(candidates, key=lambda c: c[1])[0] if candidates else None
         except Exception:
             latest = None
 
         if latest and latest.endswith(".txt"):
             state.transcript_path = latest
-            duration_ms = int((__import__('time').time() - start_ts) * 1000)
+            duration_ms = (perf_counter_ns() - t0) // 1_000_000
             logger.info(f"transcript_builder: using existing text transcript at {latest} in {duration_ms}ms")
             return state
         if os.path.exists(json_out_path):
             state.transcript_path = json_out_path
-            duration_ms = int((__import__('time').time() - start_ts) * 1000)
+            duration_ms = (perf_counter_ns() - t0) // 1_000_000
             logger.info(f"transcript_builder: reused cached transcript at {json_out_path} in {duration_ms}ms")
             return state
 
@@ -91,25 +126,48 @@ def run(state: QAState, llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter
         transcript = {
             "date": date_str,
             "videos": {},
-            "meta": {"prompt_version": state.transcript_prompt_version or "v1"}
+            "meta": {"prompt_version": prompt_version}
         }
-        for vid in state.target_videos:
-            try:
-                section = _build_section_for_video(vid, state, llm_adapter, catalog_adapter)
+        # One call per batch of SECTIONS_PER_CALL videos, run concurrently (bounded); order follows target_videos
+        sem = asyncio.Semaphore(MAX_CONCURRENT_SECTIONS)
+        batches = [
+            state.target_videos[i:i + SECTIONS_PER_CALL]
+            for i in range(0, len(state.target_videos), SECTIONS_PER_CALL)
+        ]
+
+        async def _bounded(batch: List[str]) -> List:
+            async with sem:
+                if len(batch) > 1:
+                    try:
+                        built = await _build_sections_for_batch(batch, state, llm_adapter, catalog_adapter)
+                        return [built[vid] for vid in batch]
+                    except Exception as e:
+                        logger.warning(f"transcript_builder: batch {batch} failed ({e}); retrying per video")
+                return await asyncio.gather(
+                    *(_build_section_for_video(vid, state, llm_adapter, catalog_adapter) for vid in batch),
+                    return_exceptions=True,
+                )
+
+        results = await asyncio.gather(*(_bounded(batch) for batch in batches))
+        for batch, sections in zip(batches, results):
+            for vid, section in zip(batch, sections):
+                if isinstance(section, Exception):
+                    logger.error(f"transcript_builder: failed for {vid}: {section}")
+                    section = {"activity": "", "skills": [], "students": [], "distress_events": [], "evidence_times": []}
                 transcript["videos"][vid] = section
-            except Exception as e:
-                logger.error(f"transcript_builder: failed for {vid}: {e}")
-                transcript["videos"][vid] = {"activity": "", "skills": [], "students": [], "distress_events": [], "evidence_times": []}
 
         # Persist JSON
         try:
-            with open(json_out_path, "w") as f:
-                json.dump(transcript, f, ensure_ascii=False, separators=(",", ":"))
+            # Write to a temp file and swap it in, so concurrent readers never see a partial transcript
+            tmp_path = f"{json_out_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(transcript))
+            os.replace(tmp_path, json_out_path)
             state.transcript_path = json_out_path
         except Exception as e:
-            logger.error(f"transcript_builder: failed to write transcript {out_path}: {e}")
+            logger.error(f"transcript_builder: failed to write transcript {json_out_path}: {e}")
 
-        duration_ms = int((__import__('time').time() - start_ts) * 1000)
+        duration_ms = (perf_counter_ns() - t0) // 1_000_000
         logger.info(f"transcript_builder completed in {duration_ms}ms, output: {state.transcript_path}")
         return state
 
@@ -1,31 +1,35 @@
 import logging
+from time import perf_counter_ns
 from src.state import QAState
 from src.adapters.llm_adapter import LLMAdapter
+from src.prompt_loader import load_prompt
 
 logger = logging.getLogger(__name__)
 
-def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
+async def run(state: QAState, llm_adapter: LLMAdapter) -> QAState:
     """
     Node: transcript_router
     Input: target_question
-    Output: transcript_prefer (bool)
+    Output: transcript_prefer (bool), needs_transcript (bool)
     """
-    start_ts = __import__('time').time()
+    t0 = perf_counter_ns()
     try:
-        with open("prompts/transcript_router.txt", "r") as f:
-            template = f.read()
+        template = load_prompt("prompts/transcript_router.txt")
 
         question = getattr(state, 'target_question', None) or state.user_question
         prompt = f"{template}\n\nRefined question: {question}"
-        result = llm_adapter.call_json(prompt, temperature=0.0)
+        result = await llm_adapter.acall_json(prompt, temperature=0.0)
         prefer = bool(result.get("prefer_transcript", False))
         state.transcript_prefer = prefer
+        # Only skip the transcript branch on an explicit "no"; preferring it implies needing it
+        state.needs_transcript = prefer or bool(result.get("needs_transcript", True))
 
-        dur = int((__import__('time').time() - start_ts) * 1000)
-        logger.info(f"transcript_router completed in {dur}ms, prefer_transcript={prefer}")
+        dur = (perf_counter_ns() - t0) // 1_000_000
+        logger.info(f"transcript_router completed in {dur}ms, prefer_transcript={prefer}, needs_transcript={state.needs_transcript}")
         return state
     except Exception as e:
         logger.error(f"transcript_router failed: {e}")
         state.transcript_prefer = False
+        state.needs_transcript = True
         return state
 
@@ -1,18 +1,24 @@
 import logging
+from time import perf_counter_ns
 import asyncio
 from typing import Dict
 from src.state import QAState
 from src.adapters.llm_adapter import LLMAdapter
 from src.adapters.catalog_adapter import CatalogAdapter
+from src.prompt_loader import load_prompt
 
 logger = logging.getLogger(__name__)
 
-def _analyze_single_video(
+# Max video analyses in flight at once (caps provider QPS)
+MAX_CONCURRENT_VIDEOS = 4
+
+async def _analyze_single_video(
     video_id: str, 
     target_question: str, 
     state: QAState,
     llm_adapter: LLMAdapter, 
-    catalog_adapter: CatalogAdapter
+    catalog_adapter: CatalogAdapter,
+    sem: asyncio.Semaphore,
 ) -> tuple[str, str]:
     """Analyze a single video and return (video_id, answer)"""
     try:
@@ -20,8 +26,7 @@ def _analyze_single_video(
         gcs_uri = catalog_adapter.get_uri(video_id)
         
         # Load prompt
-        with open("prompts/video_analyzer.txt", "r") as f:
-            prompt_template = f.read()
+        prompt_template = load_prompt("prompts/video_analyzer.txt")
         
         # Build prompt with child information if available
         child_context = ""
@@ -31,7 +36,8 @@ def _analyze_single_video(
         prompt = f"{prompt_template}\n\nQuestion: {target_question}{child_context}"
         
         # Call LLM for video analysis (multimodal with GCS URI)
-        answer = llm_adapter.call_video(prompt=prompt, gcs_uri=gcs_uri)
+        async with sem:
+            answer = await llm_adapter.acall_video(prompt=prompt, gcs_uri=gcs_uri)
         
         return video_id, answer
         
@@ -39,13 +45,13 @@ def _analyze_single_video(
         logger.error(f"Video analysis failed for {video_id}: {e}")
         return video_id, "Not enough evidence in this video."
 
-def run(state: QAState, llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter) -> QAState:
+async def run(state: QAState, llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter) -> QAState:
     """
     Node: video_analyzers
     Input: target_question, target_videos
     Output: per_video_answers (dict: video_id -> answer)
     """
-    start_time = __import__('time').time()
+    t0 = perf_counter_ns()
     
     try:
         if not state.target_videos:
@@ -53,15 +59,15 @@ def run(state: QAState, llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter
             state.per_video_answers = {}
             return state
         
-        # Run video analyses sequentially since we're now synchronous
-        results = []
-        for video_id in state.target_videos:
-            try:
-                result = _analyze_single_video(video_id, state.target_question, state, llm_adapter, catalog_adapter)
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Video analysis failed for {video_id}: {e}")
-                results.append((video_id, f"Error analyzing video: {e}"))
+        # Run video analyses concurrently (bounded); gather keeps target_videos order
+        sem = asyncio.Semaphore(MAX_CONCURRENT_VIDEOS)
+        results = await asyncio.gather(
+            *(
+                _analyze_single_video(video_id, state.target_question, state, llm_adapter, catalog_adapter, sem)
+                for video_id in state.target_videos
+            ),
+            return_exceptions=True,
+        )
         
         # Process results
         per_video_answers = {}
@@ -76,7 +82,7 @@ def run(state: QAState, llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter
         state.per_video_answers = per_video_answers
         
         # Log success
-        duration_ms = int((__import__('time').time() - start_time) * 1000)
+        duration_ms = (perf_counter_ns() - t0) // 1_000_000
         video_ids = list(per_video_answers.keys())
         logger.info(f"video_analyzers completed in {duration_ms}ms, output_fields_set: ['per_video_answers'], video_ids: {video_ids}")
         
@@ -1,55 +1,61 @@
+import re
 import logging
-from typing import List
+from time import perf_counter_ns
+from typing import List, Optional
+
+import orjson
 from src.state import QAState
 from src.adapters.llm_adapter import LLMAdapter
 from src.adapters.catalog_adapter import CatalogAdapter
+from src.prompt_loader import load_prompt
 
 logger = logging.getLogger(__name__)
 
-def run(state: QAState, llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter) -> QAState:
+# Bounds on the catalog sent to the picker prompt, so a large catalog cannot blow up the token count
+MAX_CATALOG_ENTRIES = 50
+MAX_DESCRIPTION_CHARS = 200
+
+# Catalog time strings like "10:00" / "9:45"
+_TIME_RE = re.compile(r"^(\d{1,2}):(\d{2})$")
+
+def _to_minutes(value) -> Optional[float]:
+    """Minutes for a numeric time or an "HH:MM" string; None when unparseable"""
+    if isinstance(value, (int, float)):
+        return value
+    m = _TIME_RE.match(value.strip()) if isinstance(value, str) else None
+    return int(m[1]) * 60 + int(m[2]) if m else None
+
+async def run(state: QAState, llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter) -> QAState:
     """
     Node: video_picker
     Input: user_question
     Output: target_videos (list of video IDs)
     """
-    start_time = __import__('time').time()
+    t0 = perf_counter_ns()
+    catalog = []
     
     try:
-        # Load prompt
-        with open("prompts/video_picker.txt", "r") as f:
-            prompt_template = f.read()
-        
         # Get catalog info for prompt with enhanced context
         catalog = catalog_adapter.list_catalog()
+        
+        # Load prompt
+        prompt_template = load_prompt("prompts/video_picker.txt")
+        
+        # Project the catalog fields the picker needs (first MAX_CATALOG_ENTRIES videos)
         catalog_info = []
-        for video in catalog:
+        for video in catalog[:MAX_CATALOG_ENTRIES]:
             # Calculate duration if start and end times are available
             duration = "Unknown"
-            start_time = video.get('start-time')
-            end_time = video.get('end-time')
+            start = video.get('start-time')
+            end = video.get('end-time')
             
-            # Handle both numeric and time string formats
-            if start_time is not None and end_time is not None:
-                try:
-                    if isinstance(start_time, (int, float)) and isinstance(end_time, (int, float)):
-                        # Numeric times (minutes)
-                        duration = f"{end_time - start_time} minutes"
-                    elif isinstance(start_time, str) and isinstance(end_time, str):
-                        # Time strings like "10:00"
-                        try:
-                            # Parse time strings and calculate duration
-                            start_parts = start_time.split(':')
-                            end_parts = end_time.split(':')
-                            if len(start_parts) == 2 and len(end_parts) == 2:
-                                start_minutes = int(start_parts[0]) * 60 + int(start_parts[1])
-                                end_minutes = int(end_parts[0]) * 60 + int(start_parts[1])
-                                duration = f"{end_minutes - start_minutes} minutes"
-                        except:
-                            duration = f"{start_time} - {end_time}"
-                    else:
-                        duration = f"{start_time} - {end_time}"
-                except:
-                    duration = f"{start_time} - {end_time}"
+            # Handle both numeric (minutes) and "HH:MM" formats
+            if start is not None and end is not None:
+                start_minutes, end_minutes = _to_minutes(start), _to_minutes(end)
+                if start_minutes is not None and end_minutes is not None:
+                    duration = f"{end_minutes - start_minutes} minutes"
+                else:
+                    duration = f"{start} - {end}"
             
             catalog_info.append({
                 'id': video['id'],
@@ -57,8 +63,7 @@ def run(state: QAState, llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter
                 'start-time': video.get('start-time', 'Unknown'),
                 'end-time': video.get('end-time', 'Unknown'),
                 'duration': duration,
-                'act-description': video.get('act-description', 'No description provided'),
-                'gcs_uri': video.get('gcs_uri', 'No URI')[:50] + '...' if video.get('gcs_uri') else 'No URI'
+                'act-description': (video.get('act-description') or 'No description provided')[:MAX_DESCRIPTION_CHARS],
             })
         
         # Build prompt with child information if available
@@ -67,12 +72,14 @@ def run(state: QAState, llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter
             child_context = f"\n\nChild Information: {state.child_info}"
         
         # Use original question if available, otherwise use current question
-        question_to_use = getattr(state, 'original_question', state.user_question)
+        question_to_use = state.original_question or state.user_question
         
-        prompt = f"{prompt_template}\n\nQuestion: {question_to_use}{child_context}\n\nCatalog: {catalog_info}"
+        # Compact, key-sorted JSON is smaller than the dict repr and byte-stable across calls
+        catalog_json = orjson.dumps(catalog_info, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+        prompt = f"{prompt_template}\n\nQuestion: {question_to_use}{child_context}\n\nCatalog: {catalog_json}"
         
         # Call LLM for JSON response
-        response = llm_adapter.call_json(prompt, temperature=0.0)
+        response = await llm_adapter.acall_json(prompt, temperature=0.0)
         
         # Extract video IDs
         if 'videos' in response and isinstance(response['videos'], list):
@@ -83,23 +90,22 @@ def run(state: QAState, llm_adapter: LLMAdapter, catalog_adapter: CatalogAdapter
             if not valid_ids:
                 # Fallback: use first 3 videos
                 logger.warning("No valid video IDs returned, using fallback")
-                valid_ids = list(catalog.keys())[:3]
+                valid_ids = [video['id'] for video in catalog[:3]]
             
             state.target_videos = valid_ids
             
         else:
             # Fallback: use first 3 videos
             logger.warning("Invalid JSON response, using fallback")
-            state.target_videos = list(catalog.keys())[:3]
+            state.target_videos = [video['id'] for video in catalog[:3]]
         
         # Log success
-        duration_ms = int((__import__('time').time() - start_time) * 1000)
+        duration_ms = (perf_counter_ns() - t0) // 1_000_000
         logger.info(f"video_picker completed in {duration_ms}ms, output_fields_set: ['target_videos'], target_videos: {state.target_videos}")
         
     except Exception as e:
         logger.error(f"video_picker failed: {e}")
-        # Fallback: use first 3 videos
-        catalog = catalog_adapter.list_catalog()
+        # Fallback: use first 3 videos (catalog fetched above, if that much succeeded)
         state.target_videos = [video['id'] for video in catalog[:3]]
     
     # Return the modified state to preserve all fields
@@ -0,0 +1,7 @@
+import functools
+
+@functools.lru_cache(maxsize=None)
+def load_prompt(path: str) -> str:
+    """Read a prompt template once per process; later calls are served from memory"""
+    with open(path, "r") as f:
+        return f.read()
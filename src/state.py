@@ -1,5 +1,5 @@
 from typing import List, Dict, Optional, Sequence, Annotated
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 import uuid
 import operator
@@ -19,6 +19,7 @@ class QAState(BaseModel):
     child_info: Optional[str] = Field(None, description="Child's name and clothing description")
     target_videos: Optional[List[str]] = Field(None, description="Video IDs selected for deep analysis")
     target_question: Optional[str] = Field(None, description="Refined question for per-video analysis")
+    force_refine: bool = Field(default=False, description="Always run the LLM refiner, even for short single-sentence questions")
     per_video_answers: Optional[Dict[str, str]] = Field(None, description="Answers from each video analyzer")
     final_answer: Optional[str] = Field(None, description="Synthesized answer to user_question")
     
@@ -29,16 +30,17 @@ class QAState(BaseModel):
     transcript_answer: Optional[str] = Field(None, description="Answer derived from transcript if sufficient")
     used_transcript: bool = Field(default=False, description="Whether final answer came from transcript path")
     transcript_prefer: bool = Field(default=False, description="Prefer transcript path for this question (activities/skills, not child-specific)")
+    needs_transcript: bool = Field(default=True, description="Whether the transcript branch can help at all (False skips straight to video analysis)")
     
     # Conversation management - using LangGraph's standard message handling
     messages: Annotated[Sequence[BaseMessage], operator.add] = Field(default_factory=list, description="LangGraph message history")
     conversation_history: List[ConversationMessage] = Field(default_factory=list, description="Running chat history with parent")
     followup_response: Optional[str] = Field(None, description="Response to a follow-up question")
+    followup_needed: bool = Field(default=False, description="Whether the history ends with a parent turn the composed answer does not cover (set by composer)")
     waiting_for_child_info: bool = Field(default=False, description="Whether we're waiting for child identification")
     
     # Metadata
     request_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique request identifier")
     created_at: datetime = Field(default_factory=datetime.now)
     
-    class Config:
-        arbitrary_types_allowed = True
+    model_config = ConfigDict(arbitrary_types_allowed=True)
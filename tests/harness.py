@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Shared event loop for running the async test scripts outside pytest.
+
+Every script's __main__ block calls run(...), so one warm loop (uvloop when
+installed) serves every coroutine in the process instead of each asyncio.run
+building and tearing down its own. `python -m tests.harness` runs all the
+async test scripts on that single loop.
+"""
+
+import asyncio
+import atexit
+
+try:
+    import uvloop
+except ImportError:  # uvloop is unavailable on Windows
+    uvloop = None
+
+# Prefer uvloop's faster event loop when it is installed
+loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+asyncio.set_event_loop(loop)
+atexit.register(loop.close)
+
+def run(coro):
+    """Run a coroutine to completion on the shared loop"""
+    return loop.run_until_complete(coro)
+
+def skip_reason(test):
+    """Reason from a true @pytest.mark.skipif on test, or None when it should run"""
+    for mark in getattr(test, "pytestmark", ()):
+        if mark.name == "skipif" and mark.args and mark.args[0]:
+            return mark.kwargs.get("reason", "skipped")
+    return None
+
+if __name__ == "__main__":
+    from tests.test_child_identification import test_child_identifier
+    from tests.test_system_flow import test_system_flow
+    from tests.test_vertex_ai import test_vertex_ai
+
+    for test in (test_child_identifier, test_system_flow, test_vertex_ai):
+        # Honour the same skip conditions pytest would
+        reason = skip_reason(test)
+        if reason:
+            print(f"⏭️  Skipping {test.__name__}: {reason}")
+            continue
+        run(test())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the main-flow response cache and single-flight helpers
+"""
+
+import asyncio
+
+import pytest
+
+import src.cache
+from src.cache import ResponseCache, SingleFlight, adapter_scope, cache_key, normalize_question
+
+def test_normalize_question():
+    """Test case, punctuation and spacing do not change the cache key"""
+    assert normalize_question("  Did my child PAINT today?! ") == "did my child paint today"
+    assert normalize_question(None) == ""
+    assert cache_key("What did they do?") == cache_key("what  did they do")
+    assert cache_key("What did they do?", "Emma, blue dress") != cache_key("What did they do?")
+
+def test_cache_key_namespaces():
+    """Test graph variants and adapter scopes never share a key"""
+    question = "What did they do?"
+    assert cache_key(question, variant="full") != cache_key(question, variant="main")
+    first, second = object(), object()
+    assert adapter_scope(first, second) != adapter_scope(second, first)
+    assert cache_key(question, scope=adapter_scope(first, second)) != cache_key(question, scope=adapter_scope(second, second))
+
+@pytest.mark.asyncio
+async def test_response_cache_ttl(monkeypatch):
+    """Test entries expire after their TTL"""
+    now = [1000.0]
+    monkeypatch.setattr(src.cache.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(ttl=10)
+    await cache.set("a", 1)
+    await cache.set("b", 2, ttl=100)
+    assert await cache.get("a") == 1
+    now[0] += 11
+    assert await cache.get("a") is None
+    assert await cache.get("b") == 2
+    assert cache.stats == {"hits": 2, "misses": 1}
+
+@pytest.mark.asyncio
+async def test_response_cache_lru_eviction():
+    """Test the least recently used entry is evicted when full"""
+    cache = ResponseCache(maxsize=2)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    assert await cache.get("a") == 1
+    await cache.set("c", 3)
+    assert await cache.get("b") is None
+    assert await cache.get("a") == 1
+    assert await cache.get("c") == 3
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_result():
+    """Test concurrent identical calls run fn once"""
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(flight.do("k", work), flight.do("k", work))
+    assert results == [(42, False), (42, True)]
+    assert len(calls) == 1
+    assert not flight._inflight
+
+@pytest.mark.asyncio
+async def test_single_flight_leader_failure():
+    """Test a leader failure reaches every caller and frees the key"""
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(flight.do("k", boom), flight.do("k", boom), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    await asyncio.sleep(0)
+    assert not flight._inflight
+
+@pytest.mark.asyncio
+async def test_single_flight_leader_cancelled():
+    """Test cancelling the leader does not cancel its followers"""
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return 42
+
+    leader = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    assert await follower == (42, True)
+    assert leader.cancelled()
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
@@ -4,51 +4,79 @@ Test script for child identification flow
 """
 
 import asyncio
-import sys
-import os
 
-# Add project root to path so 'src' can be imported
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
 
 from src.state import QAState
-from src.nodes.child_identifier import run as child_identifier
+from src.nodes.child_identifier import run as child_identifier, _heuristic_requires_child
 
+class MockLLMAdapter:
+    """Stateless no-op stand-in for LLMAdapter; async like the real methods the nodes await"""
+
+    async def acall_text(self, *args, **kwargs) -> str:
+        return ""
+
+    async def acall_json(self, *args, **kwargs) -> dict:
+        return {}
+
+MOCK = MockLLMAdapter()
+
+@pytest.mark.asyncio
 async def test_child_identifier():
     """Test the child identifier node"""
     
     print("🧪 Testing Child Identifier Node")
     print("=" * 50)
     
-    # Test 1: First interaction (should ask for child info)
-    print("\n📝 Test 1: First interaction")
+    # Test 1: first interaction (should ask for child info)
     state1 = QAState(user_question="Did my child participate in the art activity?")
+    # Test 2: with child info provided (should proceed)
+    state2 = QAState(
+        user_question="Did my child participate in the art activity?",
+        child_info="Emma, wearing a blue dress with white polka dots"
+    )
     
-    # Mock LLM adapter (not needed for this test)
-    class MockLLMAdapter:
-        pass
-    
-    result1 = await child_identifier(state1, MockLLMAdapter())
+    # The two runs are independent; print once both have finished
+    result1, result2 = await asyncio.gather(child_identifier(state1, MOCK), child_identifier(state2, MOCK))
     
+    print("\n📝 Test 1: First interaction")
     print(f"Original question: {result1.original_question}")
     print(f"Current question: {result1.user_question}")
     print(f"Waiting for child info: {result1.waiting_for_child_info}")
     print(f"Child info: {getattr(result1, 'child_info', 'Not set')}")
+    assert result1.waiting_for_child_info
+    assert result1.original_question == "Did my child participate in the art activity?"
+    assert result1.user_question != result1.original_question
+    assert result1.conversation_history[-1].content == result1.user_question
     
-    # Test 2: With child info provided (should proceed)
     print("\n📝 Test 2: With child info provided")
-    state2 = QAState(
-        user_question="Did my child participate in the art activity?",
-        child_info="Emma, wearing a blue dress with white polka dots"
-    )
-    
-    result2 = await child_identifier(state2, MockLLMAdapter())
-    
     print(f"Original question: {result2.original_question}")
     print(f"Current question: {result2.user_question}")
     print(f"Waiting for child info: {result2.waiting_for_child_info}")
     print(f"Child info: {getattr(result2, 'child_info', 'Not set')}")
+    assert not result2.waiting_for_child_info
+    assert result2.user_question == "Did my child participate in the art activity?"
     
     print("\n✅ Child identifier tests completed!")
 
+@pytest.mark.parametrize("question, expected", [
+    # The parent names their own child
+    ("Did my child participate in the art activity?", True),
+    ("Was my daughter upset at drop-off?", True),
+    ("Did our son finish his lunch?", True),
+    # Clearly class-wide
+    ("What did the class do today?", False),
+    ("What was on the menu today?", False),
+    # Ambiguous wording is left to the LLM classifier
+    ("Did the kids finish the puzzle?", None),
+    ("Was the class happy at circle time?", None),
+    ("Was he restless in class?", None),
+])
+def test_heuristic_requires_child(question, expected):
+    """Test the keyword gate only decides unambiguous questions"""
+    assert _heuristic_requires_child(question) is expected
+
 if __name__ == "__main__":
-    asyncio.run(test_child_identifier())
+    # Shared warm loop (uvloop when installed); see tests/harness.py
+    from tests.harness import run
+    run(test_child_identifier())
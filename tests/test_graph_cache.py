@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test that cached main-flow results stay with the adapters that produced them
+"""
+
+import pytest
+
+import src.graph
+from src.cache import response_cache
+from src.graph import run_main_flow
+
+QUESTION = "Did my child participate in the art activity?"
+
+class MockLLMAdapter:
+    """Answers every text call with its own name and counts the calls"""
+
+    def __init__(self, name: str):
+        self.model_name = name
+        self.calls = 0
+
+    async def acall_text(self, *args, **kwargs) -> str:
+        self.calls += 1
+        return f"answer from {self.model_name}"
+
+class MockCatalogAdapter:
+    catalog_path = "mock/videos.yaml"
+
+async def _fake_direct(state, llm_adapter, catalog_adapter):
+    """Stand-in for the node chain: the final answer comes straight from the adapter"""
+    state.final_answer = await llm_adapter.acall_text(state.user_question)
+    return state
+
+@pytest.mark.asyncio
+async def test_main_flow_cache_is_per_adapter(monkeypatch):
+    """Test two different adapters never share a cached answer"""
+    monkeypatch.setattr(src.graph, "_run_main_flow_direct", _fake_direct)
+    await response_cache.clear()
+    first, second = MockLLMAdapter("first"), MockLLMAdapter("second")
+    catalog = MockCatalogAdapter()
+
+    result1 = await run_main_flow(QUESTION, llm_adapter=first, catalog_adapter=catalog, child_info="Emma")
+    result2 = await run_main_flow(QUESTION, llm_adapter=second, catalog_adapter=catalog, child_info="Emma")
+    assert result1.final_answer == "answer from first"
+    assert result2.final_answer == "answer from second"
+    assert (first.calls, second.calls) == (1, 1)
+
+    # Same adapter again: served from the cache without another call
+    result3 = await run_main_flow(QUESTION, llm_adapter=first, catalog_adapter=catalog, child_info="Emma")
+    assert result3.final_answer == "answer from first"
+    assert first.calls == 1
+    await response_cache.clear()
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
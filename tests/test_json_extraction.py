@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test script for JSON payload extraction from model output
+"""
+
+import pytest
+
+from src.adapters.llm_adapter import LLMAdapter, _balanced_span, _outer_span
+
+# Only the parsing helpers are exercised, so skip __init__ (no Vertex client needed)
+ADAPTER = LLMAdapter.__new__(LLMAdapter)
+
+# (model output, expected JSON text)
+EXTRACT_CASES = {
+    "fenced_json": ('```json\n{"a": 1}\n```', '{"a": 1}'),
+    "fenced_plain": ("```\n[1, 2]\n```", "[1, 2]"),
+    "prose_around": ('Here you go: {"a": {"b": 2}} thanks', '{"a": {"b": 2}}'),
+    "braces_in_string": ('Result: {"a": "}{"} done', '{"a": "}{"}'),
+    "array_of_objects": ('Answer: [{"a": 1}, {"b": 2}] end', '[{"a": 1}, {"b": 2}]'),
+    # Equal-length object and array: the object wins regardless of order
+    "tie_object_first": ('x {"k":12} y [1,2,34] z', '{"k":12}'),
+    "tie_array_first": ('x [1,2,34] y {"k":12} z', '{"k":12}'),
+    # Unbalanced payload falls back to first-to-last bracket
+    "unbalanced": ('prefix {"a": [1, 2} tail', '{"a": [1, 2}'),
+    "no_json": ("no json here", "no json here"),
+}
+
+@pytest.mark.parametrize("text, expected", EXTRACT_CASES.values(), ids=EXTRACT_CASES.keys())
+def test_extract_json_text(text, expected):
+    """Test the sanitized candidate handed to json.loads"""
+    assert ADAPTER._extract_json_text(text) == expected
+
+def test_balanced_span():
+    """Test bracket matching skips escaped quotes and rejects mismatched closers"""
+    assert _balanced_span('{"a": "\\"}"} tail', 0) == '{"a": "\\"}"}'
+    assert _balanced_span('{"a": [1}', 0) is None
+    assert _balanced_span('{"a": 1', 0) is None
+
+def test_outer_span():
+    """Test the first-opener to last-closer fallback"""
+    assert _outer_span("a {x} b }", "{") == "{x} b }"
+    assert _outer_span("} {", "{") is None
+    assert _outer_span("no brackets", "[") is None
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))
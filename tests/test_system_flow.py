@@ -3,16 +3,15 @@
 Test the system flow without making API calls
 """
 
-import asyncio
-import sys
-import os
-
-# Add project root to path so 'src' can be imported
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
 
 from src.state import QAState, ConversationMessage
-from src.adapters.catalog_adapter import CatalogAdapter
+from src.adapters.catalog_adapter import get_catalog_adapter
+
+# Shape of the refined question the simulated question_refiner produces (bound once at import)
+REFINED_Q_TMPL = "Did {name} participate in the {activity} while wearing {outfit}?".format
 
+@pytest.mark.asyncio
 async def test_system_flow():
     """Test the system flow without API calls"""
     
@@ -22,16 +21,17 @@ async def test_system_flow():
     # Test 1: Load catalog
     print("\n📝 Test 1: Loading video catalog")
     try:
-        catalog_adapter = CatalogAdapter()
+        # Process-wide adapter: the catalog is parsed and indexed once, lookups below are dict hits
+        catalog_adapter = get_catalog_adapter()
         catalog = catalog_adapter.list_catalog()
+        assert catalog, "catalog is empty"
         print(f"✅ Catalog loaded successfully with {len(catalog)} videos")
         
         for video in catalog:
             print(f"  - {video['id']}: {video['session-type']} ({video['start-time']} - {video['end-time']})")
             
     except Exception as e:
-        print(f"❌ Catalog loading failed: {e}")
-        return
+        pytest.fail(f"❌ Catalog loading failed: {e}")
     
     # Test 2: Create initial state
     print("\n📝 Test 2: Creating initial state")
@@ -42,8 +42,7 @@ async def test_system_flow():
         print(f"  - Request ID: {initial_state.request_id}")
         
     except Exception as e:
-        print(f"❌ State creation failed: {e}")
-        return
+        pytest.fail(f"❌ State creation failed: {e}")
     
     # Test 3: Simulate child identification flow
     print("\n📝 Test 3: Simulating child identification flow")
@@ -66,8 +65,7 @@ async def test_system_flow():
         print(f"✅ Child info provided: {child_response}")
         
     except Exception as e:
-        print(f"❌ Child identification simulation failed: {e}")
-        return
+        pytest.fail(f"❌ Child identification simulation failed: {e}")
     
     # Test 4: Simulate video selection
     print("\n📝 Test 4: Simulating video selection")
@@ -82,18 +80,18 @@ async def test_system_flow():
             print(f"  - {vid_id}: {video_info['act-description']}")
         
     except Exception as e:
-        print(f"❌ Video selection simulation failed: {e}")
-        return
+        pytest.fail(f"❌ Video selection simulation failed: {e}")
     
     # Test 5: Simulate question refinement
     print("\n📝 Test 5: Simulating question refinement")
     try:
-        initial_state.target_question = "Did Emma participate in the water activity while wearing a blue dress with white polka dots?"
+        initial_state.target_question = REFINED_Q_TMPL(
+            name="Emma", activity="water activity", outfit="a blue dress with white polka dots"
+        )
         print(f"✅ Question refined: {initial_state.target_question}")
         
     except Exception as e:
-        print(f"❌ Question refinement simulation failed: {e}")
-        return
+        pytest.fail(f"❌ Question refinement simulation failed: {e}")
     
     # Test 6: Simulate video analysis
     print("\n📝 Test 6: Simulating video analysis")
@@ -107,8 +105,7 @@ async def test_system_flow():
             print(f"  - {vid_id}: {answer[:80]}...")
         
     except Exception as e:
-        print(f"❌ Video analysis simulation failed: {e}")
-        return
+        pytest.fail(f"❌ Video analysis simulation failed: {e}")
     
     # Test 7: Simulate final composition
     print("\n📝 Test 7: Simulating final composition")
@@ -118,8 +115,7 @@ async def test_system_flow():
         print(f"  - Answer: {initial_state.final_answer[:100]}...")
         
     except Exception as e:
-        print(f"❌ Final composition simulation failed: {e}")
-        return
+        pytest.fail(f"❌ Final composition simulation failed: {e}")
     
     print("\n🎉 System flow test completed successfully!")
     print("\n📋 Summary of what the system would do:")
@@ -132,4 +128,6 @@ async def test_system_flow():
     print("   Next step: Enable the Generative Language API to test with real AI calls")
 
 if __name__ == "__main__":
-    asyncio.run(test_system_flow())
+    # Shared warm loop (uvloop when installed); see tests/harness.py
+    from tests.harness import run
+    run(test_system_flow())
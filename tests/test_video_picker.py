@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test the video picker's catalog projection without API calls
+"""
+
+import pytest
+
+from src.state import QAState
+from src.nodes.video_picker import run as video_picker
+
+CATALOG = (
+    {"id": "vid_1", "session-type": "Circle time", "start-time": "9:30", "end-time": "9:45", "act-description": "Morning songs"},
+    # A row whose description is present but null must not break the pick
+    {"id": "vid_2", "session-type": "Art", "start-time": "10:00", "end-time": "10:20", "act-description": None},
+)
+
+class MockCatalogAdapter:
+    def list_catalog(self):
+        return CATALOG
+
+    def has(self, video_id: str) -> bool:
+        return any(video["id"] == video_id for video in CATALOG)
+
+class MockLLMAdapter:
+    """Records the picker prompt and picks vid_2"""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def acall_json(self, prompt: str, *args, **kwargs) -> dict:
+        self.prompts.append(prompt)
+        return {"videos": ["vid_2"]}
+
+@pytest.mark.asyncio
+async def test_null_description_keeps_llm_pick():
+    """Test a null act-description is replaced instead of forcing the fallback"""
+    llm = MockLLMAdapter()
+    state = await video_picker(QAState(user_question="What did they paint today?"), llm, MockCatalogAdapter())
+    assert state.target_videos == ["vid_2"]
+    assert '"act-description":"No description provided"' in llm.prompts[0]
+    assert '"duration":"20 minutes"' in llm.prompts[0]
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-v"]))